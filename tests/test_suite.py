@@ -129,6 +129,53 @@ def test_memory_writable():
         print(f"  ❌ FAIL: Cannot write to memory directory")
         return False
 
+def test_self_reflect_runs():
+    """Smoke test: self_reflect imports and its main() completes"""
+    global TESTS_RUN, TESTS_PASSED
+    TESTS_RUN += 1
+    
+    tools_dir = Path(WORKSPACE) / "tools"
+    result = subprocess.run(
+        ["python3", "-c", "import self_reflect; self_reflect.main()"],
+        cwd=tools_dir, capture_output=True, text=True, timeout=120
+    )
+    
+    if result.returncode == 0:
+        print(f"  ✅ PASS: self_reflect imports and runs")
+        TESTS_PASSED += 1
+        return True
+    else:
+        last_line = (result.stderr.strip().splitlines() or ["no output"])[-1]
+        print(f"  ❌ FAIL: self_reflect crashed: {last_line}")
+        return False
+
+def test_pattern_learner_peak():
+    """Peak hour skips timestamps fromisoformat rejects; ties go to the first hour seen"""
+    global TESTS_RUN, TESTS_PASSED
+    TESTS_RUN += 1
+    
+    tools_dir = Path(WORKSPACE) / "tools"
+    check = (
+        "import pattern_learner as p; E = p.LogEntry; "
+        "logs = {'a_log': [E('2026-02-10T09:00:00', '', 'x'), E('2026-02-10T08:30:29NST', '', 'x'), "
+        "E('2026-02-10T08:00:00.5', '', 'x'), E('2026-02-10T09:10:00Z', '', 'x'), E('2026-02-10T08:10:00', '', 'x')]}; "
+        "peak = p.analyze_all(logs)['peak_activity']; "
+        "assert peak == {'peak_hour': 9, 'activity_count': 2, 'total_entries': 4}, peak"
+    )
+    result = subprocess.run(
+        ["python3", "-c", check],
+        cwd=tools_dir, capture_output=True, text=True, timeout=60
+    )
+    
+    if result.returncode == 0:
+        print(f"  ✅ PASS: pattern_learner peak hour matches the baseline rules")
+        TESTS_PASSED += 1
+        return True
+    else:
+        last_line = (result.stderr.strip().splitlines() or ["no output"])[-1]
+        print(f"  ❌ FAIL: pattern_learner peak hour: {last_line}")
+        return False
+
 def main():
     print("🦅 Claw Test Suite")
     print("="*50)
@@ -141,6 +188,8 @@ def main():
         ("Services Running", test_services_running),
         ("Git Repository", test_git_repo),
         ("Memory Writable", test_memory_writable),
+        ("Self-Reflect Smoke", test_self_reflect_runs),
+        ("Pattern Learner Peak", test_pattern_learner_peak),
     ]
     
     for name, test_func in tests:
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Claw Git Cache
+Commit counts cached by HEAD sha, shared by the briefing and the webhook server
+"""
+
+import json
+import os
+import subprocess
+import threading
+
+COUNT_CACHE = "/tmp/claw_commit_count.json"
+
+_counts = {}  # repo -> (head sha, count), this process's copy of COUNT_CACHE
+_lock = threading.Lock()
+
+def read_git_head(git_dir):
+    """Resolve HEAD to a commit sha by reading .git directly (loose or packed ref)"""
+    with open(os.path.join(git_dir, "HEAD"), 'r') as f:
+        head = f.read().strip()
+    if not head.startswith("ref: "):
+        return head  # detached HEAD
+    ref = head[5:]
+    try:
+        with open(os.path.join(git_dir, ref), 'r') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        with open(os.path.join(git_dir, "packed-refs"), 'r') as f:
+            for line in f:
+                if line.rstrip('\n').endswith(" " + ref):
+                    return line.split(" ", 1)[0]
+    return None
+
+def _load():
+    try:
+        with open(COUNT_CACHE, 'r') as f:
+            return {repo: tuple(v) for repo, v in json.load(f).items()}
+    except (OSError, ValueError, TypeError):
+        return {}
+
+def _save(counts):
+    tmp = f"{COUNT_CACHE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'w') as f:
+            json.dump(counts, f)
+        os.replace(tmp, COUNT_CACHE)
+    except OSError:
+        pass  # only a cache
+
+def resolve_head(repo):
+    """HEAD's sha for repo, read from .git when possible, else via rev-parse ('' if none)"""
+    try:
+        head = read_git_head(os.path.join(repo, ".git"))
+    except OSError:
+        head = None
+    if head is None:
+        head = subprocess.run(
+            ["git", "-C", repo, "rev-parse", "--verify", "-q", "HEAD"],
+            capture_output=True, text=True
+        ).stdout.strip()
+    return head
+
+def commit_count(repo, head=None):
+    """Commits reachable from HEAD (or head), running rev-list only when it moves"""
+    if head is None:
+        head = resolve_head(repo)
+    if not head:
+        return 0
+
+    with _lock:
+        cached = _counts.get(repo)
+        if cached is None or cached[0] != head:
+            _counts.update(_load())
+            cached = _counts.get(repo)
+        if cached is not None and cached[0] == head:
+            return cached[1]
+
+    out = subprocess.run(
+        ["git", "-C", repo, "rev-list", "--count", head],
+        capture_output=True, text=True
+    ).stdout.strip()
+    if not out:
+        return 0
+    count = int(out)
+
+    with _lock:
+        _counts.update(_load())
+        _counts[repo] = (head, count)
+        _save(_counts)
+    return count
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Claw JSONL Logger
+Append-only JSON-lines writers that keep their log file open between records,
+and a reader for the newest entries of a log
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+
+# No padding after ',' and ':'; readers json.loads each line either way
+SEPARATORS = (',', ':')
+
+def reversed_lines(path, block=64 * 1024):
+    """Yield the non-empty lines of path newest first, as bytes, reading backwards by block"""
+    with open(path, 'rb') as f:
+        pos = os.fstat(f.fileno()).st_size
+        head = b''  # start of a line that continues into the block after it
+        while pos > 0:
+            start = max(0, pos - block)
+            f.seek(start)
+            lines = (f.read(pos - start) + head).split(b'\n')
+            pos = start
+            head = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line
+        if head:
+            yield head
+
+def tail_jsonl(path, count, keep=None):
+    """The last count entries of a JSONL file, oldest first, reading only its tail.
+
+    Malformed lines are skipped, as are entries keep() rejects when given.
+    """
+    entries = []
+    if count <= 0:
+        return entries
+    for line in reversed_lines(path):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if keep is None or keep(entry):
+            entries.append(entry)
+            if len(entries) == count:
+                break
+    entries.reverse()
+    return entries
+
+class JsonlLogger:
+    """One open descriptor per log file; safe to share between threads.
+
+    The file is opened lazily on the first record. Before each write the
+    path is stat'ed and the descriptor reopened if the inode changed, so
+    log_cleanup's rewrite/rotation never leaves records going to an
+    unlinked file. With max_bytes, a file that has grown past it is moved
+    to path.1 (a single rotation) before the next write.
+    """
+
+    def __init__(self, path, max_bytes=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._fd = None
+        self._ino = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        self._ino = os.fstat(self._fd).st_ino
+
+    def _stale(self):
+        try:
+            return os.stat(self.path).st_ino != self._ino
+        except FileNotFoundError:
+            return True
+
+    def _close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _rotate(self):
+        """Move the oversized log aside and start a new one; caller holds the lock"""
+        try:
+            # Only rotate if another process hasn't already moved our file aside
+            if os.stat(self.path).st_ino == self._ino:
+                os.replace(self.path, self.path + '.1')
+        except FileNotFoundError:
+            pass
+        self._close()
+        self._open()
+
+    def _write(self, data):
+        """Append data, reopening first if the file was rotated; caller holds the lock"""
+        if self._fd is None or self._stale():
+            self._close()
+            self._open()
+        if self.max_bytes is not None and os.fstat(self._fd).st_size > self.max_bytes:
+            self._rotate()
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+
+    def log(self, record):
+        """Append record as one JSON line"""
+        self.write(json.dumps(record, separators=SEPARATORS) + '\n')
+
+    def write(self, line):
+        """Append an already serialized line (newline included)"""
+        data = line.encode()
+        with self._lock:
+            self._write(data)
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+class BatchedJsonlLogger(JsonlLogger):
+    """JsonlLogger that queues records and appends them in batches.
+
+    A batch goes out once max_batch records are waiting, or every
+    flush_interval seconds from a background thread. Written data is
+    fdatasync'ed at most every sync_interval seconds and on close, which
+    also runs at interpreter exit so nothing queued is lost on a clean
+    shutdown.
+    """
+
+    def __init__(self, path, max_batch=64, flush_interval=1.0, sync_interval=5.0, max_bytes=None):
+        super().__init__(path, max_bytes)
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.sync_interval = sync_interval
+        self._pending = []
+        self._unsynced = False
+        self._last_sync = time.monotonic()
+        self._stop = threading.Event()
+        self._flusher = None
+        atexit.register(self.close)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def _flush(self, sync=False):
+        """Write out pending records; caller holds the lock"""
+        if self._pending:
+            data = ''.join(self._pending).encode()
+            self._pending = []
+            self._write(data)
+            self._unsynced = True
+        if self._unsynced and (sync or time.monotonic() - self._last_sync >= self.sync_interval):
+            os.fdatasync(self._fd)
+            self._unsynced = False
+            self._last_sync = time.monotonic()
+
+    def write(self, line):
+        """Queue an already serialized line (newline included)"""
+        with self._lock:
+            self._pending.append(line)
+            if self._flusher is None:
+                self._stop.clear()
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+
+    def flush(self, sync=False):
+        """Write out queued records now; sync=True also fdatasyncs them"""
+        with self._lock:
+            self._flush(sync)
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            self._flusher = None
+            self._flush(sync=True)
+            self._close()
@@ -8,107 +8,137 @@ Claw Pattern Learner
 Analyzes logs to learn my behavior patterns and optimize
 """
 
+import heapq
 import json
 import os
+import sys
 from datetime import datetime, timedelta
-from collections import Counter, defaultdict
+from collections import Counter
+from dataclasses import dataclass
 from pathlib import Path
 
 WORKSPACE = "/config/clawd"
 
+@dataclass(slots=True)
+class LogEntry:
+    """The fields the analysis needs from one log line (slotted: no per-entry dict)"""
+    timestamp: str
+    status: str
+    action: str
+
+def to_log_entry(data):
+    """Build a LogEntry from a parsed JSON object, or None if it isn't one"""
+    if not isinstance(data, dict):
+        return None
+    ts = data.get('timestamp')
+    status = data.get('status')
+    return LogEntry(
+        ts if isinstance(ts, str) else '',
+        sys.intern(status) if isinstance(status, str) else '',
+        data.get('action', 'unknown'),
+    )
+
 def read_all_logs():
     """Read all log files"""
     logs = {}
     log_dir = Path(WORKSPACE) / "memory"
     
-    for log_file in log_dir.glob("*_log.jsonl"):
+    try:
+        log_files = [e for e in os.scandir(log_dir) if e.name.endswith("_log.jsonl")]
+    except OSError:
+        return logs
+    
+    for log_file in log_files:
         entries = []
         try:
-            with open(log_file, 'r') as f:
-                for line in f:
-                    try:
-                        data = json.loads(line)
-                        # Handle array-wrapped logs (some logs store as [...])
-                        if isinstance(data, list):
-                            entries.extend(data)
-                        else:
-                            entries.append(data)
-                    except:
-                        pass
+            # Binary read skips the text decoder; json.loads accepts bytes
+            with open(log_file.path, 'rb') as f:
+                raw = f.read()
+            for line in raw.split(b'\n'):
+                if not line.strip():
+                    continue
+                try:
+                    data = json.loads(line)
+                except:
+                    continue
+                # Handle array-wrapped logs (some logs store as [...])
+                for item in (data if isinstance(data, list) else (data,)):
+                    entry = to_log_entry(item)
+                    if entry is not None:
+                        entries.append(entry)
         except:
             pass
-        logs[log_file.stem] = entries
+        logs[log_file.name[:-len(".jsonl")]] = entries
     
     return logs
 
-def analyze_peak_activity(logs):
-    """Find when I'm most active"""
-    all_timestamps = []
-    
-    for log_name, entries in logs.items():
-        for entry in entries:
-            ts = entry.get('timestamp')
-            if ts:
-                try:
-                    dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-                    all_timestamps.append(dt)
-                except:
-                    pass
-    
-    if not all_timestamps:
+def timestamp_hour(ts):
+    """Hour of an ISO 8601 timestamp, or None if fromisoformat rejects it"""
+    try:
+        return datetime.fromisoformat(ts.replace('Z', '+00:00')).hour
+    except ValueError:
         return None
-    
-    hours = Counter(dt.hour for dt in all_timestamps)
-    peak_hour = hours.most_common(1)[0]
-    
-    return {
-        "peak_hour": peak_hour[0],
-        "activity_count": peak_hour[1],
-        "total_entries": len(all_timestamps)
-    }
 
-def find_error_patterns(logs):
-    """Find recurring errors"""
-    errors = []
-    
-    for log_name, entries in logs.items():
-        for entry in entries:
-            if entry.get('status') in ['error', 'failed']:
-                errors.append({
-                    'log': log_name,
-                    'action': entry.get('action', 'unknown'),
-                    'error': entry.get('error', entry.get('details', 'unknown')),
-                    'timestamp': entry.get('timestamp')
-                })
-    
-    # Group by error type
-    error_types = defaultdict(list)
-    for err in errors:
-        key = f"{err['log']}/{err['action']}"
-        error_types[key].append(err)
-    
-    return {
-        'total_errors': len(errors),
-        'recurring_issues': [
-            {'issue': k, 'count': len(v), 'last_seen': max(e['timestamp'] for e in v)}
-            for k, v in sorted(error_types.items(), key=lambda x: len(x[1]), reverse=True)[:5]
-        ]
-    }
+ERROR_STATUSES = frozenset(('error', 'failed'))
+OK_STATUSES = frozenset(('success', 'completed', 'ok'))
 
-def analyze_success_patterns(logs):
-    """What works well"""
-    successes = []
+def analyze_all(logs):
+    """Peak activity, recurring errors and reliable operations in one pass over the logs"""
+    hours = bytearray()  # one byte per timestamped entry, binned after the loop
+    error_stats = {}  # "log/action" -> [count, latest timestamp]
+    total_errors = 0
+    success_counts = Counter()
     
     for log_name, entries in logs.items():
         for entry in entries:
-            if entry.get('status') in ['success', 'completed', 'ok']:
-                successes.append(entry.get('action', 'unknown'))
-    
-    success_counts = Counter(successes)
+            ts = entry.timestamp
+            if ts:
+                hour = timestamp_hour(ts)
+                if hour is not None:
+                    hours.append(hour)
+            
+            status = entry.status
+            if status in ERROR_STATUSES:
+                total_errors += 1
+                key = f"{log_name}/{entry.action}"
+                cur = error_stats.get(key)
+                if cur is None:
+                    error_stats[key] = [1, ts]
+                else:
+                    cur[0] += 1
+                    # Fixed-format ISO timestamps order correctly as strings
+                    if ts > cur[1]:
+                        cur[1] = ts
+            elif status in OK_STATUSES:
+                success_counts[entry.action] += 1
+    
+    # bytearray.count runs in C, so the histogram costs 24 flat scans
+    hour_counts = [hours.count(h) for h in range(24)]
+    total = len(hours)
+    peak_activity = None
+    if total:
+        # Ties go to the hour seen first, as Counter.most_common would
+        top = max(hour_counts)
+        peak_hour = min((h for h in range(24) if hour_counts[h] == top), key=hours.index)
+        peak_activity = {
+            "peak_hour": peak_hour,
+            "activity_count": hour_counts[peak_hour],
+            "total_entries": total
+        }
     
     return {
-        'total_successes': len(successes),
-        'most_reliable': success_counts.most_common(5)
+        'peak_activity': peak_activity,
+        'error_patterns': {
+            'total_errors': total_errors,
+            'recurring_issues': [
+                {'issue': k, 'count': v[0], 'last_seen': v[1]}
+                for k, v in heapq.nlargest(5, error_stats.items(), key=lambda x: x[1][0])
+            ]
+        },
+        'success_patterns': {
+            'total_successes': sum(success_counts.values()),
+            'most_reliable': success_counts.most_common(5)
+        }
     }
 
 def generate_optimization_recommendations(analysis):
@@ -148,20 +178,23 @@ def generate_learning_report():
     """Generate complete learning report"""
     print("🦅 Claw Pattern Learner")
     print("=" * 50)
-    print(f"Analysis time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    analysis_time = datetime.now()
+    print(f"Analysis time: {analysis_time.strftime('%Y-%m-%d %H:%M:%S')}")
     print()
     
     logs = read_all_logs()
     print(f"📊 Analyzed {len(logs)} log sources")
     
+    analysis = analyze_all(logs)
+    
     # Peak activity
-    peak_activity = analyze_peak_activity(logs)
+    peak_activity = analysis['peak_activity']
     if peak_activity:
         print(f"\n⏰ Peak Activity: Hour {peak_activity['peak_hour']}:00")
         print(f"   {peak_activity['activity_count']} entries during peak")
     
     # Error patterns
-    error_patterns = find_error_patterns(logs)
+    error_patterns = analysis['error_patterns']
     print(f"\n❌ Errors: {error_patterns['total_errors']} total")
     if error_patterns['recurring_issues']:
         print("   Top recurring issues:")
@@ -169,19 +202,13 @@ def generate_learning_report():
             print(f"   • {issue['issue']}: {issue['count']} times")
     
     # Success patterns
-    success_patterns = analyze_success_patterns(logs)
+    success_patterns = analysis['success_patterns']
     print(f"\n✅ Successes: {success_patterns['total_successes']} total")
     print("   Most reliable operations:")
     for op, count in success_patterns['most_reliable'][:3]:
         print(f"   • {op}: {count} successes")
     
     # Recommendations
-    analysis = {
-        'peak_activity': peak_activity,
-        'error_patterns': error_patterns,
-        'success_patterns': success_patterns
-    }
-    
     recommendations = generate_optimization_recommendations(analysis)
     
     print(f"\n💡 Recommendations ({len(recommendations)}):")
@@ -191,7 +218,7 @@ def generate_learning_report():
     
     # Save report
     report = {
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': analysis_time.isoformat(),
         'analysis': analysis,
         'recommendations': recommendations
     }
@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 """Claw Performance Monitor"""
 
-import json
 import os
 import subprocess
+import sys
 import time
 from datetime import datetime
 
+from jsonl_log import JsonlLogger, tail_jsonl
+
 os.environ["TZ"] = "America/St_Johns"
 try:
     time.tzset()
@@ -14,6 +16,9 @@ except Exception:
     pass
 
 LOG_FILE = "/config/clawd/memory/performance_log.jsonl"
+MAX_LOG_BYTES = 16 << 20  # rotate to LOG_FILE.1 past this size
+
+_perf_log = JsonlLogger(LOG_FILE, max_bytes=MAX_LOG_BYTES)
 
 
 def run_cmd(cmd, timeout=10):
@@ -26,80 +31,77 @@ def measure_git_operations():
     return {"git_status_time": round(time.time() - start, 3), "git_success": result.returncode == 0}
 
 
-def measure_file_operations():
-    test_file = "/tmp/perf_test.txt"
-    start = time.time()
-    with open(test_file, "w") as f:
-        f.write("x" * 1000000)
-    write_time = time.time() - start
-
-    start = time.time()
-    with open(test_file, "r") as f:
-        _ = f.read()
-    read_time = time.time() - start
-
-    os.remove(test_file)
-    return {"file_write_1mb": round(write_time, 3), "file_read_1mb": round(read_time, 3)}
-
-
-def measure_python_startup():
-    start = time.time()
-    run_cmd(["python3", "-c", "print('ok')"], timeout=10)
-    return {"python_startup": round(time.time() - start, 3)}
+def measure_disk_sync():
+    # A read straight after a write only hits the page cache; time one synced
+    # 4 KiB write on the workspace disk instead.
+    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+    test_file = os.path.join(os.path.dirname(LOG_FILE), ".perf_sync_test")
+    fd = os.open(test_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        start = time.time()
+        os.pwrite(fd, b"x" * 4096, 0)
+        os.fdatasync(fd)
+        sync_time = time.time() - start
+    finally:
+        os.close(fd)
+        os.remove(test_file)
+    return {"disk_sync_4kb": round(sync_time, 4)}
+
+
+def measure_python_startup(runs=3):
+    # -S skips site.py so this times the interpreter itself; the best of a few
+    # runs filters out cold-cache noise.
+    best = None
+    for _ in range(runs):
+        start = time.time()
+        run_cmd([sys.executable, "-S", "-c", "pass"], timeout=10)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {"python_startup": round(best, 3)}
 
 
 def get_system_stats():
+    # Read straight from the kernel instead of forking df/free/uptime/ps
     stats = {}
     try:
-        df = run_cmd(["df", "-P", "/config"])
-        stats["disk_usage_percent"] = int(df.stdout.strip().splitlines()[1].split()[4].replace("%", ""))
-    except (IndexError, ValueError, subprocess.TimeoutExpired):
+        st = os.statvfs("/config")
+        used = st.f_blocks - st.f_bfree
+        stats["disk_usage_percent"] = -(-used * 100 // (used + st.f_bavail))  # rounds up, like df
+    except (OSError, ZeroDivisionError):
         stats["disk_usage_percent"] = None
 
     try:
-        free = run_cmd(["free"]) 
-        mem_line = [l for l in free.stdout.splitlines() if l.startswith("Mem:")][0]
-        parts = mem_line.split()
-        used, total = float(parts[2]), float(parts[1])
-        stats["memory_usage_percent"] = round((used / total) * 100.0, 1)
-    except (IndexError, ValueError, subprocess.TimeoutExpired):
+        meminfo = {}
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                meminfo[key] = int(value.split()[0])
+        total = meminfo["MemTotal"]
+        stats["memory_usage_percent"] = round((total - meminfo["MemAvailable"]) / total * 100.0, 1)
+    except (OSError, KeyError, IndexError, ValueError, ZeroDivisionError):
         stats["memory_usage_percent"] = None
 
     try:
-        uptime = run_cmd(["uptime"])
-        if "load average:" in uptime.stdout:
-            load = uptime.stdout.split("load average:")[1].split(",")[0].strip()
-            stats["load_average"] = float(load)
-        else:
-            stats["load_average"] = None
-    except (ValueError, subprocess.TimeoutExpired):
+        stats["load_average"] = os.getloadavg()[0]
+    except OSError:
         stats["load_average"] = None
 
     try:
-        ps = run_cmd(["ps", "aux"])
-        stats["process_count"] = len(ps.stdout.splitlines())
-    except subprocess.TimeoutExpired:
+        stats["process_count"] = sum(1 for name in os.listdir("/proc") if name.isdigit())
+    except OSError:
         stats["process_count"] = None
 
     return stats
 
 
 def log_performance(metrics):
-    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-    with open(LOG_FILE, "a") as f:
-        f.write(json.dumps({"timestamp": datetime.now().isoformat(), "metrics": metrics}) + "\n")
+    _perf_log.log({"timestamp": datetime.now().isoformat(), "metrics": metrics})
 
 
 def analyze_trends():
     if not os.path.exists(LOG_FILE):
         return None
-    entries = []
-    with open(LOG_FILE, "r") as f:
-        for line in f:
-            try:
-                entries.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
+    entries = tail_jsonl(LOG_FILE, 2)
     if len(entries) < 2:
         return None
     latest, previous = entries[-1]["metrics"], entries[-2]["metrics"]
@@ -115,7 +117,7 @@ def main():
     print("🦅 Performance Monitor")
     metrics = {
         **measure_git_operations(),
-        **measure_file_operations(),
+        **measure_disk_sync(),
         **measure_python_startup(),
         "system": get_system_stats(),
     }
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Claw Port Probe
+Listening-socket check from the kernel's TCP tables, shared by the self-heal
+daemon and the webhook server
+"""
+
+def port_listening(port):
+    """True/False from the kernel's TCP tables, or None if /proc is unavailable"""
+    target = f":{port:04X}"
+    found_table = False
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                next(f, None)  # header
+                found_table = True
+                for line in f:
+                    fields = line.split()
+                    # local_address ends in :PORT (hex); state 0A is LISTEN
+                    if len(fields) > 3 and fields[3] == "0A" and fields[1].endswith(target):
+                        return True
+        except OSError:
+            continue
+    return False if found_table else None
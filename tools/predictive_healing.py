@@ -15,43 +15,80 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from collections import defaultdict
 
+from jsonl_log import JsonlLogger, tail_jsonl
+
 WORKSPACE = "/config/clawd"
 LOG_FILE = "/config/clawd/memory/predictive_healing_log.jsonl"
 PREDICTIONS_FILE = "/config/clawd/memory/predictions.json"
+MAX_LOG_BYTES = 16 << 20  # rotate to LOG_FILE.1 past this size
+# Derived-value caches live in /tmp, outside the git-tracked workspace
+TREND_CACHE = "/tmp/claw_trend_cache.json"
+RESTART_CACHE = "/tmp/claw_restart_cache.json"
+ACTION_COOLDOWN = 3600  # seconds before the same preemptive script is launched again
+# One git call covers both 6-hour windows; commits are bucketed by timestamp
+GIT_COMMIT_TIMES_CMD = ("git", "-C", WORKSPACE, "log", "--since=12 hours ago", "--pretty=format:%ct")
+
+_prediction_log = JsonlLogger(LOG_FILE, max_bytes=MAX_LOG_BYTES)
 
-def log_prediction(issue, confidence, action_taken):
-    """Log prediction and action"""
+def log_prediction(issue, confidence, action_taken, timestamp=None):
+    """Log prediction and action (timestamp defaults to now; main() passes its check time)"""
     entry = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": timestamp or datetime.now().isoformat(),
         "predicted_issue": issue,
         "confidence": confidence,
         "action": action_taken
     }
-    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-    with open(LOG_FILE, 'a') as f:
-        f.write(json.dumps(entry) + '\n')
+    _prediction_log.log(entry)
+
+def _disk_pct(entry):
+    """disk_usage_percent of a timestamped performance log entry, None if absent"""
+    try:
+        return entry['timestamp'] and entry['metrics']['system'].get('disk_usage_percent')
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+def disk_history_tail(perf_log, count):
+    """Last `count` disk measurements from the performance log, reading only its tail"""
+    return [{'timestamp': e['timestamp'], 'disk_pct': _disk_pct(e)}
+            for e in tail_jsonl(perf_log, count, keep=_disk_pct)]
+
+def load_mtime_cache(cache_path, mtime_ns):
+    """Return (True, value) if cache_path was computed from a source with this mtime"""
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+        if cached['mtime_ns'] == mtime_ns:
+            return True, cached['value']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return False, None
+
+def save_mtime_cache(cache_path, mtime_ns, value):
+    """Remember a value derived from a source file with the given mtime"""
+    try:
+        with open(cache_path, 'w') as f:
+            json.dump({'mtime_ns': mtime_ns, 'value': value}, f, separators=(',', ':'))
+    except OSError:
+        pass
 
 def analyze_disk_trend():
     """Predict when disk will be full based on growth rate"""
-    # Get disk usage history
-    history = []
     perf_log = Path(WORKSPACE) / "memory" / "performance_log.jsonl"
+    if not perf_log.exists():
+        return None
     
-    if perf_log.exists():
-        with open(perf_log, 'r') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    if 'metrics' in entry and 'system' in entry['metrics']:
-                        disk = entry['metrics']['system'].get('disk_usage_percent')
-                        if disk:
-                            history.append({
-                                'timestamp': entry['timestamp'],
-                                'disk_pct': disk
-                            })
-                except:
-                    pass
-    
+    # The prediction only depends on the log contents; reuse it until perf_monitor writes again
+    cache_path = TREND_CACHE
+    mtime_ns = perf_log.stat().st_mtime_ns
+    hit, prediction = load_mtime_cache(cache_path, mtime_ns)
+    if not hit:
+        # Only the last few measurements are used
+        prediction = disk_trend_prediction(disk_history_tail(perf_log, 5))
+        save_mtime_cache(cache_path, mtime_ns, prediction)
+    return prediction
+
+def disk_trend_prediction(history):
+    """Disk-full prediction from recent disk usage measurements"""
     if len(history) < 3:
         return None
     
@@ -103,18 +140,26 @@ def predict_service_failure():
     heal_log = Path(WORKSPACE) / "memory" / "self_heal_log.jsonl"
     
     if heal_log.exists():
-        with open(heal_log, 'r') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    if entry.get('action') and 'restart' in entry['action']:
-                        history.append({
-                            'timestamp': entry['timestamp'],
-                            'service': entry['action'].replace('restart_', ''),
-                            'status': entry.get('status')
-                        })
-                except:
-                    pass
+        # The restart history only changes when the heal log does; the
+        # last-hour window below still has to be applied on every run
+        cache_path = RESTART_CACHE
+        mtime_ns = heal_log.stat().st_mtime_ns
+        hit, history = load_mtime_cache(cache_path, mtime_ns)
+        if not hit:
+            history = []
+            with open(heal_log, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        if entry.get('action') and 'restart' in entry['action']:
+                            history.append({
+                                'timestamp': entry['timestamp'],
+                                'service': entry['action'].replace('restart_', ''),
+                                'status': entry.get('status')
+                            })
+                    except:
+                        pass
+            save_mtime_cache(cache_path, mtime_ns, history)
     
     if not history:
         return None
@@ -146,17 +191,14 @@ def predict_service_failure():
 def predict_commit_velocity_drop():
     """Predict if commit rate is dropping"""
     try:
-        result = subprocess.run(
-            ["git", "-C", WORKSPACE, "log", "--since=6 hours ago", "--oneline"],
-            capture_output=True, text=True
-        )
-        recent_commits = len([l for l in result.stdout.strip().split('\n') if l])
-        
-        result2 = subprocess.run(
-            ["git", "-C", WORKSPACE, "log", "--since=12 hours ago", "--until=6 hours ago", "--oneline"],
-            capture_output=True, text=True
-        )
-        older_commits = len([l for l in result2.stdout.strip().split('\n') if l])
+        result = subprocess.run(GIT_COMMIT_TIMES_CMD, capture_output=True, text=True)
+        pivot = time.time() - 6 * 3600
+        recent_commits = older_commits = 0
+        for line in result.stdout.split():
+            if int(line) >= pivot:
+                recent_commits += 1
+            else:
+                older_commits += 1
         
         if recent_commits < older_commits * 0.5 and older_commits > 5:
             return {
@@ -171,12 +213,32 @@ def predict_commit_velocity_drop():
     
     return None
 
-def take_preemptive_action(prediction):
+def load_last_actions():
+    """When each issue last launched a preemptive script (epoch seconds), from PREDICTIONS_FILE"""
+    try:
+        with open(PREDICTIONS_FILE, 'r') as f:
+            last_actions = json.load(f).get('last_actions', {})
+        return last_actions if isinstance(last_actions, dict) else {}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+def in_cooldown(issue, last_actions):
+    """True if a script was launched for this issue within ACTION_COOLDOWN"""
+    last = last_actions.get(issue)
+    return isinstance(last, (int, float)) and time.time() - last < ACTION_COOLDOWN
+
+def take_preemptive_action(prediction, last_actions=None):
     """Take action before failure occurs"""
     issue = prediction['issue']
+    if last_actions is None:
+        last_actions = {}
+    
+    if issue in ('disk_full', 'activity_drop') and in_cooldown(issue, last_actions):
+        return "Skipped (cooldown: action already taken within the hour)"
     
     if issue == 'disk_full':
         # Run cleanup early
+        last_actions[issue] = time.time()
         subprocess.run(
             ["python3", f"{WORKSPACE}/tools/log_cleanup.py"],
             capture_output=True
@@ -190,6 +252,7 @@ def take_preemptive_action(prediction):
     
     elif issue == 'activity_drop':
         # Trigger immediate improvement cycle
+        last_actions[issue] = time.time()
         subprocess.run(
             ["python3", f"{WORKSPACE}/tools/improve.py"],
             capture_output=True
@@ -201,10 +264,14 @@ def take_preemptive_action(prediction):
 def main():
     print("🦅 Predictive Self-Healing")
     print("=" * 50)
-    print(f"Analysis time: {datetime.now().strftime('%H:%M:%S')}")
+    # One check time for the whole run: every prediction is stamped with it
+    check_time = datetime.now()
+    check_ts = check_time.isoformat()
+    print(f"Analysis time: {check_time.strftime('%H:%M:%S')}")
     print()
     
     predictions = []
+    last_actions = load_last_actions()
     
     # Run all prediction models
     models = [
@@ -224,10 +291,10 @@ def main():
             print(f"      Time to issue: {pred.get('time_to_issue', 'soon')}")
             
             # Take preemptive action
-            action = take_preemptive_action(pred)
+            action = take_preemptive_action(pred, last_actions)
             print(f"      Action: {action}")
             
-            log_prediction(pred['issue'], pred['confidence'], action)
+            log_prediction(pred['issue'], pred['confidence'], action, check_ts)
         else:
             print(f"   ✓ No issues predicted")
     
@@ -241,9 +308,10 @@ def main():
     # Save predictions for trend analysis
     with open(PREDICTIONS_FILE, 'w') as f:
         json.dump({
-            'last_check': datetime.now().isoformat(),
+            'last_check': check_ts,
             'predictions': predictions,
-            'total_predictions_made': len(predictions)
+            'total_predictions_made': len(predictions),
+            'last_actions': last_actions
         }, f, indent=2)
     
     print(f"\n📄 Predictions saved: {PREDICTIONS_FILE}")
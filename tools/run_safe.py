@@ -1,14 +1,19 @@
 #!/usr/bin/env python3
 """Run commands with retry + logging (no shell=True)."""
 
+import functools
 import json
 import os
+import random
 import shlex
+import shutil
 import subprocess
 import sys
 import time
 from datetime import datetime
 
+from jsonl_log import JsonlLogger
+
 os.environ["TZ"] = "America/St_Johns"
 try:
     time.tzset()
@@ -16,23 +21,65 @@ except Exception:
     pass
 
 LOG_FILE = "/config/clawd/memory/operation_log.jsonl"
+MAX_LOG_BYTES = 16 << 20  # rotate to LOG_FILE.1 past this size
+
+
+_operation_log = JsonlLogger(LOG_FILE, max_bytes=MAX_LOG_BYTES)
+
+
+# Same bytes json.dumps(entry, separators=(",", ":")) would produce, but a retried
+# command is only JSON-escaped once and empty fields skip the encoder entirely
+_OPERATION_TEMPLATE = '{"timestamp":"%s","command":%s,"status":%s,"output":%s,"error":%s}\n'
+
+
+@functools.lru_cache(maxsize=256)
+def _cmd_json(cmd):
+    return json.dumps(cmd)
+
+
+def _json_str(value):
+    return json.dumps(value[:500]) if value else '""'
 
 
 def log_operation(cmd, status, output="", error=""):
-    entry = {
-        "timestamp": datetime.now().isoformat(),
-        "command": cmd,
-        "status": status,
-        "output": (output or "")[:500],
-        "error": (error or "")[:500],
-    }
-    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-    with open(LOG_FILE, "a") as f:
-        f.write(json.dumps(entry) + "\n")
+    line = _OPERATION_TEMPLATE % (
+        datetime.now().isoformat(),
+        _cmd_json(cmd),
+        json.dumps(status),
+        _json_str(output),
+        _json_str(error),
+    )
+    _operation_log.write(line)
+
+
+def backoff_delay(attempt, retry_delay, max_delay=30):
+    # Exponential backoff with jitter: ~retry_delay/2..1.5x on the first retry
+    return min(max_delay, retry_delay * (2 ** (attempt - 1))) * (0.5 + random.random())
+
+
+_which_cache = {}
+
+
+def resolve_executable(name):
+    # Search PATH once per program name rather than on every exec/retry
+    if os.sep in name:
+        return name
+    path = _which_cache.get(name)
+    if path is None:
+        path = shutil.which(name) or name
+        _which_cache[name] = path
+    return path
 
 
 def run_with_retry(cmd, max_retries=3, retry_delay=5):
-    parts = shlex.split(cmd)
+    """Run cmd with retries. Prefer an argv list; a string is tokenized with shlex once."""
+    if isinstance(cmd, str):
+        parts = shlex.split(cmd)
+    else:
+        parts = list(cmd)
+        cmd = shlex.join(parts)
+    if parts:
+        parts[0] = resolve_executable(parts[0])
     for attempt in range(1, max_retries + 1):
         try:
             result = subprocess.run(parts, capture_output=True, text=True, timeout=300)
@@ -42,7 +89,7 @@ def run_with_retry(cmd, max_retries=3, retry_delay=5):
             err = f"Exit code {result.returncode}: {result.stderr}"
             if attempt < max_retries:
                 log_operation(cmd, f"retry_{attempt}", error=err)
-                time.sleep(retry_delay)
+                time.sleep(backoff_delay(attempt, retry_delay))
             else:
                 log_operation(cmd, "failed", error=err)
                 return False, result.stderr
@@ -51,22 +98,24 @@ def run_with_retry(cmd, max_retries=3, retry_delay=5):
             log_operation(cmd, f"timeout_attempt_{attempt}", error=err)
             if attempt >= max_retries:
                 return False, err
-            time.sleep(retry_delay)
+            time.sleep(backoff_delay(attempt, retry_delay))
         except Exception as e:
             log_operation(cmd, f"exception_attempt_{attempt}", error=str(e))
             if attempt >= max_retries:
                 return False, str(e)
-            time.sleep(retry_delay)
+            time.sleep(backoff_delay(attempt, retry_delay))
     return False, "Max retries exceeded"
 
 
 def main():
     if len(sys.argv) < 2:
         print("Usage: python3 run_safe.py 'your command here'")
+        print("       python3 run_safe.py your command here")
         sys.exit(1)
 
-    command = sys.argv[1]
-    print(f"🦅 Running with retry protection: {command}")
+    # A single quoted argument is a command line; several are already an argv list
+    command = sys.argv[1] if len(sys.argv) == 2 else sys.argv[1:]
+    print(f"🦅 Running with retry protection: {command if isinstance(command, str) else shlex.join(command)}")
     success, output = run_with_retry(command)
     if success:
         print("✓ Success")
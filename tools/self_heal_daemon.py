@@ -4,12 +4,16 @@ Claw Self-Healing Daemon
 Keeps services running without human intervention
 """
 
-import json
 import os
+import queue
 import subprocess
+import threading
 import time
 from datetime import datetime
 
+from jsonl_log import JsonlLogger
+from port_probe import port_listening
+
 os.environ["TZ"] = "America/St_Johns"
 try:
     time.tzset()
@@ -18,6 +22,17 @@ except Exception:
 
 LOG_FILE = "/config/clawd/memory/self_heal_log.jsonl"
 CHECK_INTERVAL = 60
+DASHBOARD_PORT = 8080
+MAX_CHECK_INTERVAL = 300  # back off to this while every tick is nominal
+GIT_CHECK_INTERVAL = 300
+
+# The daemon runs for days: one descriptor, reopened if log_cleanup replaces
+# the file; JsonlLogger is thread-safe, and the git worker thread logs too
+_heal_log = JsonlLogger(LOG_FILE)
+
+# add/commit/push run on a worker thread so a slow push never stalls the checks
+_git_q = queue.Queue(maxsize=4)
+_git_thread = None
 
 
 def run_cmd(cmd, timeout=15, cwd=None):
@@ -25,15 +40,13 @@ def run_cmd(cmd, timeout=15, cwd=None):
 
 
 def log_action(action, status, details=""):
-    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
     entry = {
         "timestamp": datetime.now().isoformat(),
         "action": action,
         "status": status,
         "details": details,
     }
-    with open(LOG_FILE, "a") as f:
-        f.write(json.dumps(entry) + "\n")
+    _heal_log.log(entry)
 
 
 def start_dashboard():
@@ -46,10 +59,11 @@ def start_dashboard():
     return proc.pid > 0
 
 
-def check_process(name, check_cmd):
+def check_process(name, check_cmd, pattern):
+    # Down if the probe fails or its output lacks `pattern`
     try:
         result = run_cmd(check_cmd)
-        if result.returncode != 0 or not result.stdout.strip():
+        if result.returncode != 0 or pattern not in result.stdout:
             print(f"⚠️  {name} is down, restarting...")
             ok = start_dashboard() if name == "dashboard" else False
             log_action(f"restart_{name}", "success" if ok else "error")
@@ -62,39 +76,76 @@ def check_process(name, check_cmd):
     return False
 
 
+def check_dashboard():
+    listening = port_listening(DASHBOARD_PORT)
+    if listening is None:
+        # no /proc/net (non-Linux): fall back to asking ss
+        return check_process("dashboard", ["ss", "-tlnp"], f":{DASHBOARD_PORT}")
+    if listening:
+        return False
+    print("⚠️  dashboard is down, restarting...")
+    try:
+        ok = start_dashboard()
+    except Exception as e:
+        log_action("check_dashboard", "error", str(e))
+        return False
+    log_action("restart_dashboard", "success" if ok else "error")
+    return ok
+
+
 def check_disk_space():
     try:
-        result = run_cmd(["df", "-P", "/config"])
-        if result.returncode != 0:
-            return False
-        lines = result.stdout.strip().splitlines()
-        if len(lines) < 2:
-            return False
-        usage_field = lines[1].split()[4].replace("%", "")
-        usage = int(usage_field)
+        # One statvfs, no df fork; used/(used+avail) rounded up, like df,
+        # perf_monitor and smart_alerts
+        st = os.statvfs("/config")
+        used = st.f_blocks - st.f_bfree
+        usage = -(-used * 100 // (used + st.f_bavail))
         if usage > 90:
             log_action("disk_space", "critical", f"Disk usage: {usage}%")
             return True
         if usage > 75:
             log_action("disk_space", "warning", f"Disk usage: {usage}%")
             return True
-    except (IndexError, ValueError) as e:
-        log_action("disk_space", "error", f"parse error: {e}")
     except Exception as e:
         log_action("disk_space", "error", str(e))
     return False
 
 
+def commit_and_push(changes):
+    try:
+        run_cmd(["git", "add", "-A"], cwd="/config/clawd", timeout=20)
+        run_cmd(["git", "commit", "-m", f"Auto-commit: {changes} uncommitted changes at {datetime.now().isoformat()}"], cwd="/config/clawd", timeout=20)
+        run_cmd(["git", "push"], cwd="/config/clawd", timeout=30)
+        log_action("auto_commit", "success", f"Committed {changes} changes")
+    except subprocess.TimeoutExpired:
+        log_action("auto_commit", "error", "timeout")
+    except Exception as e:
+        log_action("auto_commit", "error", str(e))
+
+
+def _git_worker():
+    while True:
+        changes = _git_q.get()
+        try:
+            commit_and_push(changes)
+        finally:
+            _git_q.task_done()
+
+
 def check_git_status():
+    # Only the local `git status` runs on the daemon thread; the commit is queued
+    global _git_thread
     try:
         result = run_cmd(["git", "status", "--porcelain"], cwd="/config/clawd", timeout=20)
         if not result.stdout.strip():
             return False
+        if _git_q.unfinished_tasks:
+            return False  # previous commit still in flight; it will pick these up
         changes = len([l for l in result.stdout.splitlines() if l.strip()])
-        run_cmd(["git", "add", "-A"], cwd="/config/clawd", timeout=20)
-        run_cmd(["git", "commit", "-m", f"Auto-commit: {changes} uncommitted changes at {datetime.now().isoformat()}"], cwd="/config/clawd", timeout=20)
-        run_cmd(["git", "push"], cwd="/config/clawd", timeout=30)
-        log_action("auto_commit", "success", f"Committed {changes} changes")
+        if _git_thread is None:
+            _git_thread = threading.Thread(target=_git_worker, name="git-worker", daemon=True)
+            _git_thread.start()
+        _git_q.put_nowait(changes)
         return True
     except subprocess.TimeoutExpired:
         log_action("auto_commit", "error", "timeout")
@@ -108,35 +159,45 @@ def main():
     print(f"Logging to: {LOG_FILE}")
     print("Press Ctrl+C to stop\n")
 
+    idle_streak = 0
+    interval = CHECK_INTERVAL
+    next_git_check = 0
+    # Sleep to fixed deadlines on the monotonic clock so tick work doesn't
+    # stretch the period
+    next_tick = time.monotonic()
     while True:
         try:
             timestamp = datetime.now().strftime("%H:%M:%S")
             actions = []
 
-            if check_process("dashboard", ["ss", "-tlnp"]):
+            if check_dashboard():
                 actions.append("restarted dashboard")
 
-            # verify dashboard port specifically
-            try:
-                ss = run_cmd(["ss", "-tlnp"])
-                if ":8080" not in ss.stdout:
-                    if start_dashboard():
-                        actions.append("started dashboard")
-            except Exception:
-                pass
-
             if check_disk_space():
                 actions.append("disk alert")
 
-            if int(time.time()) % 300 < 60 and check_git_status():
-                actions.append("auto-committed")
+            now = time.time()
+            if now >= next_git_check:
+                next_git_check = now + GIT_CHECK_INTERVAL
+                if check_git_status():
+                    actions.append("auto-committed")
 
             if actions:
                 print(f"[{timestamp}] Actions: {', '.join(actions)}")
+                idle_streak = 0
+                interval = CHECK_INTERVAL
             else:
                 print(f"[{timestamp}] All systems nominal ✓")
-
-            time.sleep(CHECK_INTERVAL)
+                # stretch the interval by one step every 3 quiet ticks
+                idle_streak += 1
+                interval = min(MAX_CHECK_INTERVAL, CHECK_INTERVAL * (1 + idle_streak // 3))
+
+            next_tick += interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()  # fell behind; don't burst to catch up
         except KeyboardInterrupt:
             print("\n🛑 Self-healing daemon stopped")
             return
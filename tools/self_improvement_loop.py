@@ -9,8 +9,13 @@ Self-improvement loop v2
 
 import argparse
 import json
+import mmap
+import os
+import re
+import time
 from collections import Counter
 from datetime import datetime, timezone
+from operator import itemgetter
 from pathlib import Path
 
 WORKSPACE = Path('/config/clawd')
@@ -23,11 +28,34 @@ LESSONS_ARCHIVE = MEMORY_DIR / 'persistent_lessons_archive.jsonl'
 STYLE_FILE = MEMORY_DIR / 'style_profile.json'
 SKILL_BACKLOG = MEMORY_DIR / 'skill_growth_backlog.json'
 
+# Summary files are machine-read; --pretty switches them back to indented output
+JSON_INDENT = None
+
+# Tool-name keywords per family, one compiled alternation each; families are
+# tested separately so overlapping keywords ("cronet") still count for both
+FAMILY_RES = (
+    ('ops-reliability', re.compile('monitor|health|heal')),
+    ('network-observability', re.compile('network|net')),
+    ('self-learning', re.compile('learn|reflect|wisdom')),
+    ('automation-orchestration', re.compile('heartbeat|cron')),
+)
+
 
 def iso_now():
     return datetime.now(timezone.utc).isoformat()
 
 
+_ts_cache = [None, '']
+
+
+def iso_now_fast():
+    # Second-resolution UTC timestamp, formatted once per second; for bulk rows
+    t = int(time.time())
+    if _ts_cache[0] != t:
+        _ts_cache[:] = [t, datetime.fromtimestamp(t, timezone.utc).isoformat()]
+    return _ts_cache[1]
+
+
 def read_json(path, default):
     if not path.exists():
         return default
@@ -37,29 +65,70 @@ def read_json(path, default):
         return default
 
 
-def append_jsonl(path, obj):
+def write_json(path, obj):
+    if JSON_INDENT is None:
+        path.write_text(json.dumps(obj, ensure_ascii=False, separators=(',', ':')))
+    else:
+        path.write_text(json.dumps(obj, indent=JSON_INDENT, ensure_ascii=False))
+
+
+def write_json_if_changed(path, obj, ignore=('updated_at',)):
+    # Leave the file (and git/inotify) alone when only the ignored keys differ
+    old = read_json(path, None)
+    if isinstance(old, dict) and isinstance(obj, dict):
+        old_body = {k: v for k, v in old.items() if k not in ignore}
+        new_body = {k: v for k, v in obj.items() if k not in ignore}
+        if old_body == new_body:
+            return False
+    write_json(path, obj)
+    return True
+
+
+def append_jsonl_batch(path, objs):
+    # One open and one write for the whole batch instead of one per row
+    if not objs:
+        return
     with path.open('a') as f:
-        f.write(json.dumps(obj, ensure_ascii=False) + '\n')
+        f.write(''.join(json.dumps(o, ensure_ascii=False) + '\n' for o in objs))
 
 
 def read_jsonl(path):
     rows = []
     if not path.exists():
         return rows
-    for line in path.read_text().splitlines():
-        if not line.strip():
-            continue
-        try:
-            rows.append(json.loads(line))
-        except Exception:
-            pass
+    # Stream the file instead of holding its text and a split copy in memory
+    with path.open('r', buffering=1 << 16) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except Exception:
+                pass
     return rows
 
 
-def write_jsonl(path, rows):
-    with path.open('w') as f:
-        for row in rows:
-            f.write(json.dumps(row, ensure_ascii=False) + '\n')
+def iter_jsonl_mapped(path):
+    # Parse rows straight out of a read-only mapping so the OS pages the file in
+    # and out; only rows the caller keeps stay in memory
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with path.open('rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for raw in iter(mm.readline, b''):
+            if not raw.strip():
+                continue
+            try:
+                yield json.loads(raw)
+            except Exception:
+                pass
+
+
+def write_jsonl_atomic(path, rows):
+    # One joined write to a temp file, then rename over the original: a crash
+    # mid-write can no longer leave a truncated lessons file behind
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_text(''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows))
+    os.replace(tmp, path)
 
 
 def build_persistent_learning_layer():
@@ -87,17 +156,26 @@ def build_persistent_learning_layer():
         },
     ]
 
+    # Steady state: the summary already vouches for every seed and the lessons
+    # file hasn't changed size since, so skip re-reading the whole file.
+    seed_lessons = {seed['lesson'] for seed in seeds}
+    cached = read_json(LESSONS_SUMMARY, {})
+    if isinstance(cached, dict) and LESSONS_FILE.exists():
+        if (cached.get('lessons_file_bytes') == LESSONS_FILE.stat().st_size
+                and seed_lessons <= set(cached.get('seed_lessons_present', []))):
+            return {'added': 0, 'total': cached.get('total_lessons', 0)}
+
     existing = read_jsonl(LESSONS_FILE)
     existing_lessons = {e.get('lesson') for e in existing}
 
-    added = 0
+    new_events = []
     for seed in seeds:
         if seed['lesson'] in existing_lessons:
             continue
-        event = {'timestamp': iso_now(), 'confirmations': 1, **seed}
-        append_jsonl(LESSONS_FILE, event)
-        existing.append(event)
-        added += 1
+        new_events.append({'timestamp': iso_now_fast(), 'confirmations': 1, **seed})
+    append_jsonl_batch(LESSONS_FILE, new_events)
+    existing.extend(new_events)
+    added = len(new_events)
 
     by_cat = Counter(e.get('category', 'other') for e in existing)
     summary = {
@@ -105,8 +183,10 @@ def build_persistent_learning_layer():
         'total_lessons': len(existing),
         'categories': dict(by_cat),
         'top_lessons': [e.get('lesson') for e in existing[-10:]],
+        'seed_lessons_present': sorted(seed_lessons),
+        'lessons_file_bytes': LESSONS_FILE.stat().st_size if LESSONS_FILE.exists() else 0,
     }
-    LESSONS_SUMMARY.write_text(json.dumps(summary, indent=2, ensure_ascii=False))
+    write_json_if_changed(LESSONS_SUMMARY, summary)
     return {'added': added, 'total': len(existing)}
 
 
@@ -152,7 +232,7 @@ def build_style_adaptation_profile():
         profile.setdefault('adaptation_log', []).append(calibration)
 
     profile['updated_at'] = iso_now()
-    STYLE_FILE.write_text(json.dumps(profile, indent=2, ensure_ascii=False))
+    write_json_if_changed(STYLE_FILE, profile)
     return {'adaptations': len(profile.get('adaptation_log', [])), 'persona': profile.get('persona')}
 
 
@@ -168,14 +248,8 @@ def run_skill_growth_loop():
 
     families = Counter()
     for n in names:
-        if 'monitor' in n or 'health' in n or 'heal' in n:
-            families['ops-reliability'] += 1
-        if 'network' in n or 'net' in n:
-            families['network-observability'] += 1
-        if 'learn' in n or 'reflect' in n or 'wisdom' in n:
-            families['self-learning'] += 1
-        if 'heartbeat' in n or 'cron' in n:
-            families['automation-orchestration'] += 1
+        # A name counts once per family, however many of its keywords it contains
+        families.update([fam for fam, rx in FAMILY_RES if rx.search(n)])
 
     proposed = [
         {
@@ -207,7 +281,9 @@ def run_skill_growth_loop():
     for item in proposed:
         item['score'] = score_skill(item['impact'], item['frequency'], item['effort'])
 
-    ranked = sorted(proposed, key=lambda x: x['score'], reverse=True)
+    # Rank in place; the unranked list isn't needed afterwards
+    proposed.sort(key=itemgetter('score'), reverse=True)
+    ranked = proposed
 
     backlog = {
         'updated_at': iso_now(),
@@ -217,20 +293,17 @@ def run_skill_growth_loop():
         'proposed_skills_ranked': ranked,
         'active_focus': [r['name'] for r in ranked[:2]],
     }
-    SKILL_BACKLOG.write_text(json.dumps(backlog, indent=2, ensure_ascii=False))
+    write_json(SKILL_BACKLOG, backlog)
     return {'families': dict(families), 'ideas': len(ranked), 'active_focus': backlog['active_focus']}
 
 
 def monthly_cleanup():
-    rows = read_jsonl(LESSONS_FILE)
-    if not rows:
-        return {'deduped': 0, 'archived': 0, 'remaining': 0}
-
-    deduped = []
+    total_rows = 0
     seen = {}
     archived = []
 
-    for row in rows:
+    for row in iter_jsonl_mapped(LESSONS_FILE):
+        total_rows += 1
         key = (row.get('lesson', '').strip().lower(), row.get('category', 'other'))
         if key in seen:
             # keep higher confidence version, archive lower
@@ -242,6 +315,9 @@ def monthly_cleanup():
         else:
             seen[key] = row
 
+    if not total_rows:
+        return {'deduped': 0, 'archived': 0, 'remaining': 0}
+
     deduped = list(seen.values())
 
     # Archive low-signal lessons (not durable enough)
@@ -250,26 +326,24 @@ def monthly_cleanup():
         conf = row.get('confidence', 0)
         confirmations = row.get('confirmations', 1)
         if conf < 0.60 and confirmations < 3:
-            archived.append({**row, 'archived_at': iso_now(), 'reason': 'low_signal'})
+            archived.append({**row, 'archived_at': iso_now_fast(), 'reason': 'low_signal'})
         else:
             final_rows.append(row)
 
-    if archived:
-        for a in archived:
-            append_jsonl(LESSONS_ARCHIVE, a)
+    append_jsonl_batch(LESSONS_ARCHIVE, archived)
 
-    write_jsonl(LESSONS_FILE, final_rows)
+    write_jsonl_atomic(LESSONS_FILE, final_rows)
 
     summary = {
         'updated_at': iso_now(),
         'total_lessons': len(final_rows),
         'categories': dict(Counter(r.get('category', 'other') for r in final_rows)),
         'top_lessons': [r.get('lesson') for r in final_rows[-10:]],
-        'cleanup': {'archived': len(archived), 'deduped': len(rows) - len(deduped)},
+        'cleanup': {'archived': len(archived), 'deduped': total_rows - len(deduped)},
     }
-    LESSONS_SUMMARY.write_text(json.dumps(summary, indent=2, ensure_ascii=False))
+    write_json(LESSONS_SUMMARY, summary)
 
-    return {'deduped': len(rows) - len(deduped), 'archived': len(archived), 'remaining': len(final_rows)}
+    return {'deduped': total_rows - len(deduped), 'archived': len(archived), 'remaining': len(final_rows)}
 
 
 def run_daily():
@@ -289,8 +363,13 @@ def run_monthly():
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--mode', choices=['daily', 'weekly', 'monthly', 'all'], default='all')
+    parser.add_argument('--pretty', action='store_true', help='indent the summary JSON files')
     args = parser.parse_args()
 
+    global JSON_INDENT
+    if args.pretty:
+        JSON_INDENT = 2
+
     out = {'timestamp': iso_now(), 'mode': args.mode}
 
     if args.mode in ('daily', 'all'):
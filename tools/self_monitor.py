@@ -4,48 +4,53 @@ Claw Self-Monitor
 Track my own resource usage and health
 """
 
+import fnmatch
+import io
+import json
+import math
 import os
-import os
-os.environ['TZ'] = 'America/St_Johns'
-import time
-time.tzset()
+import re
+import stat
 import subprocess
-import json
+import sys
+import time
+from collections import Counter
 from datetime import datetime
-
-WORKSPACE = "/config/clawd"
-
-WORKSPACE = "/config/clawd"
+from functools import cached_property
 
 WORKSPACE = "/config/clawd"
 CONFIG_DIR = "/config/.openclaw"
 LOG_FILE = os.path.join(WORKSPACE, "memory", "health_log.jsonl")
+HEALTH_CACHE = "/tmp/claw_health_cache.json"
+HEALTH_CACHE_TTL = int(os.environ.get("CLAW_HEALTH_TTL", "60"))  # seconds
 
-def get_disk_usage():
-    """Check disk usage of workspace"""
-    try:
-        result = subprocess.run(
-            ["du", "-sh", WORKSPACE],
-            capture_output=True, text=True
-        )
-        return result.stdout.split()[0] if result.stdout else "unknown"
-    except:
-        return "unknown"
+def format_size(num_bytes):
+    """Format a byte count the way du -h does (4.0K, 12M, 1.5G)"""
+    size = num_bytes
+    unit = ""
+    for next_unit in ("K", "M", "G", "T"):
+        if size < 1024:
+            break
+        size /= 1024
+        unit = next_unit
+    if not unit:
+        return str(size)
+    if size < 10:
+        return f"{math.ceil(size * 10) / 10:.1f}{unit}"
+    return f"{math.ceil(size)}{unit}"
 
 def get_memory_usage():
     """Get system memory info"""
     try:
         with open('/proc/meminfo', 'r') as f:
-            lines = f.readlines()
-        
-        mem_total = None
-        mem_available = None
+            data = f.read()
         
-        for line in lines:
-            if line.startswith('MemTotal:'):
-                mem_total = int(line.split()[1]) / 1024 / 1024  # GB
-            elif line.startswith('MemAvailable:'):
-                mem_available = int(line.split()[1]) / 1024 / 1024  # GB
+        # Pull the two fields straight out instead of scanning every line
+        try:
+            mem_total = int(data.split('MemTotal:', 1)[1].split(None, 1)[0]) / 1024 / 1024  # GB
+            mem_available = int(data.split('MemAvailable:', 1)[1].split(None, 1)[0]) / 1024 / 1024  # GB
+        except (IndexError, ValueError):
+            mem_total = mem_available = None
         
         if mem_total and mem_available:
             used = mem_total - mem_available
@@ -81,27 +86,190 @@ def get_openclaw_stats():
     except Exception as e:
         return {"error": str(e)}
 
+SKIP_DIRS = {'.git', 'node_modules', '__pycache__'}
+IGNORE_FILE = os.path.join(WORKSPACE, ".clawignore")
+MAX_DEPTH = 12  # deepest directory level counted below WORKSPACE
+# Kept outside WORKSPACE: writing it there would bump the mtime of a dir it caches
+# and leave an untracked file for the auto-commit to pick up
+FILE_COUNT_CACHE = "/tmp/claw_file_count_cache.json"
+
+def load_ignore_rules():
+    """Read .clawignore: one basename or fnmatch pattern per line, # comments"""
+    try:
+        with open(IGNORE_FILE, 'r') as f:
+            lines = [line.strip() for line in f]
+    except OSError:
+        return []
+    return sorted({line for line in lines if line and not line.startswith('#')})
+
+def make_ignore_check(rules):
+    """Compile rules into one predicate: plain names via a set, globs via one regex"""
+    names = frozenset(r for r in rules if not any(c in r for c in '*?['))
+    globs = [r for r in rules if r not in names]
+    pattern = re.compile('|'.join(fnmatch.translate(g) for g in globs)).match if globs else None
+    
+    def ignored(name):
+        return name in names or (pattern is not None and pattern(name) is not None)
+    return ignored
+
+def load_file_count_cache(rules):
+    """Load per-directory listings from the previous run, if made under the same rules"""
+    try:
+        with open(FILE_COUNT_CACHE, 'r') as f:
+            cache = json.load(f)
+        if cache.get("rules") == rules:
+            return cache["dirs"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    return {}
+
+def save_file_count_cache(rules, dirs):
+    """Persist per-directory listings, replacing the old cache atomically"""
+    tmp = FILE_COUNT_CACHE + '.tmp'
+    try:
+        with open(tmp, 'w') as f:
+            json.dump({"rules": rules, "dirs": dirs}, f, separators=(',', ':'))
+        os.replace(tmp, FILE_COUNT_CACHE)
+    except OSError:
+        pass
+
+def _scan_dir(path, ignored):
+    """List one directory: names of its files, of its subdirs and of what is left out of the counts"""
+    files = []
+    subdirs = []
+    excluded = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if ignored(entry.name):
+                excluded.append(entry.name)
+            elif entry.is_dir(follow_symlinks=False):
+                if entry.name in SKIP_DIRS:
+                    excluded.append(entry.name)
+                else:
+                    subdirs.append(entry.name)
+            elif not entry.is_dir():
+                # Symlinks to dirs are listed but not followed, as os.walk did
+                files.append(entry.name)
+    return files, subdirs, excluded
+
+def _tree_blocks(path):
+    """512-byte blocks used by path and everything below it, without following symlinks"""
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return 0
+    blocks = st.st_blocks
+    stack = [path] if stat.S_ISDIR(st.st_mode) else []
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        blocks += entry.stat(follow_symlinks=False).st_blocks
+                    except FileNotFoundError:
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+        except (FileNotFoundError, PermissionError):
+            pass
+    return blocks
+
+def _scan(path, stats, old_cache, new_cache, ignored, depth=0):
+    """Recursively count files and disk usage, reusing listings of dirs whose mtime is unchanged.
+
+    A directory's mtime only moves when its own entries change, so the
+    cache holds direct children only and every subdirectory is still
+    visited - but an unchanged one costs a stat instead of a getdents pass.
+    File sizes are not covered by the dir mtime, so each file is lstat'ed.
+    SKIP_DIRS, .clawignore matches and anything below MAX_DEPTH are left
+    out of the file counts but still add to total_bytes, which matches du -s.
+    """
+    st = os.stat(path)
+    cached = old_cache.get(path)
+    if cached and len(cached) == 4 and cached[0] == st.st_mtime_ns:
+        files, subdirs, excluded = cached[1], cached[2], cached[3]
+    else:
+        files, subdirs, excluded = _scan_dir(path, ignored)
+    new_cache[path] = [st.st_mtime_ns, files, subdirs, excluded]
+    
+    by_ext = stats["by_extension"]
+    blocks = st.st_blocks
+    for name in files:
+        by_ext[os.path.splitext(name)[1] or "no_extension"] += 1
+        try:
+            blocks += os.lstat(os.path.join(path, name)).st_blocks
+        except FileNotFoundError:
+            pass
+    for name in excluded:
+        blocks += _tree_blocks(os.path.join(path, name))
+    stats["total_files"] += len(files)
+    
+    if depth >= MAX_DEPTH:
+        for name in subdirs:
+            blocks += _tree_blocks(os.path.join(path, name))
+        stats["total_bytes"] += blocks * 512
+        return
+    stats["total_bytes"] += blocks * 512
+    for name in subdirs:
+        try:
+            _scan(os.path.join(path, name), stats, old_cache, new_cache, ignored, depth + 1)
+        except FileNotFoundError:
+            pass
+
 def count_files():
-    """Count various file types in workspace"""
+    """Count various file types and their disk usage in workspace"""
     stats = {
         "total_files": 0,
-        "by_extension": {}
+        "total_bytes": 0,
+        "by_extension": Counter()
     }
     
+    rules = load_ignore_rules()
+    new_cache = {}
     try:
-        for root, dirs, files in os.walk(WORKSPACE):
-            # Skip .git and node_modules
-            dirs[:] = [d for d in dirs if d not in ['.git', 'node_modules', '__pycache__']]
-            
-            for file in files:
-                stats["total_files"] += 1
-                ext = os.path.splitext(file)[1] or "no_extension"
-                stats["by_extension"][ext] = stats["by_extension"].get(ext, 0) + 1
+        _scan(WORKSPACE, stats, load_file_count_cache(rules), new_cache, make_ignore_check(rules))
+        save_file_count_cache(rules, new_cache)
     except Exception as e:
         stats["error"] = str(e)
     
     return stats
 
+class HealthSnapshot:
+    """Health sections computed on first access, so callers pay only for what they read"""
+    SECTIONS = ("disk_usage", "memory", "openclaw", "files")
+    
+    def __init__(self, now=None):
+        self.now = now or datetime.now()
+    
+    @cached_property
+    def disk_usage(self):
+        # One walk yields both the file stats and the workspace disk usage
+        files = self.files
+        return format_size(files["total_bytes"]) if "error" not in files else "unknown"
+    
+    @cached_property
+    def memory(self):
+        return get_memory_usage()
+    
+    @cached_property
+    def openclaw(self):
+        return get_openclaw_stats()
+    
+    @cached_property
+    def files(self):
+        return count_files()
+    
+    def get(self, key, default=None):
+        """dict-style access so check_alerts takes a snapshot or a logged dict"""
+        return getattr(self, key) if key in self.SECTIONS else default
+    
+    def as_dict(self):
+        """Plain dict of every section, for logging"""
+        health = {"timestamp": self.now.isoformat()}
+        for key in self.SECTIONS:
+            health[key] = getattr(self, key)
+        return health
+
 def check_alerts(health_data):
     """Check for concerning conditions"""
     alerts = []
@@ -130,72 +298,108 @@ def log_health(health_data):
     except Exception as e:
         print(f"Warning: Could not log health data: {e}")
 
-def generate_report():
-    """Generate a health report"""
-    now = datetime.now()
+def load_cached_report(ttl=HEALTH_CACHE_TTL):
+    """Return (report, health) from a report built less than ttl seconds ago"""
+    try:
+        if time.time() - os.path.getmtime(HEALTH_CACHE) >= ttl:
+            return None
+        with open(HEALTH_CACHE, 'r') as f:
+            cached = json.load(f)
+        return cached["report"], cached["health"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def save_cached_report(report, health):
+    """Store the latest report for callers within the TTL"""
+    tmp = HEALTH_CACHE + '.tmp'
+    try:
+        with open(tmp, 'w') as f:
+            json.dump({"report": report, "health": health}, f, separators=(',', ':'))
+        os.replace(tmp, HEALTH_CACHE)
+    except OSError:
+        pass
+
+def generate_report(force=False):
+    """Generate a health report, reusing one built within HEALTH_CACHE_TTL"""
+    if not force:
+        cached = load_cached_report()
+        if cached:
+            return cached
     
-    health = {
-        "timestamp": now.isoformat(),
-        "disk_usage": get_disk_usage(),
-        "memory": get_memory_usage(),
-        "openclaw": get_openclaw_stats(),
-        "files": count_files()
-    }
+    report, health = build_report()
+    save_cached_report(report, health)
+    return report, health
+
+def build_report():
+    """Build a fresh health report and log it"""
+    snapshot = HealthSnapshot()
+    now = snapshot.now
+    health = snapshot.as_dict()
     
     # Log for history
     log_health(health)
     
     # Generate report
-    report = []
-    report.append("=" * 50)
-    report.append("🏥 CLAW SELF-HEALTH CHECK")
-    report.append("=" * 50)
-    report.append(f"📅 {now.strftime('%Y-%m-%d %H:%M:%S')}")
-    report.append("")
+    buf = io.StringIO()
+    w = buf.write
+    w("=" * 50 + "\n")
+    w("🏥 CLAW SELF-HEALTH CHECK\n")
+    w("=" * 50 + "\n")
+    w(f"📅 {now.strftime('%Y-%m-%d %H:%M:%S')}\n")
+    w("\n")
     
     # Memory
     mem = health["memory"]
     if isinstance(mem, dict) and "error" not in mem:
-        report.append("🧠 SYSTEM MEMORY")
-        report.append(f"  Total: {mem['total_gb']} GB")
-        report.append(f"  Used: {mem['used_gb']} GB ({mem['percent_used']}%)")
-        report.append(f"  Available: {mem['available_gb']} GB")
-        report.append("")
+        w("🧠 SYSTEM MEMORY\n")
+        w(f"  Total: {mem['total_gb']} GB\n")
+        w(f"  Used: {mem['used_gb']} GB ({mem['percent_used']}%)\n")
+        w(f"  Available: {mem['available_gb']} GB\n")
+        w("\n")
     
     # Disk
-    report.append("💾 WORKSPACE DISK USAGE")
-    report.append(f"  {health['disk_usage']}")
-    report.append("")
+    w("💾 WORKSPACE DISK USAGE\n")
+    w(f"  {health['disk_usage']}\n")
+    w("\n")
     
     # Files
     files = health["files"]
     if "error" not in files:
-        report.append("📁 FILE STATISTICS")
-        report.append(f"  Total files: {files['total_files']}")
+        w("📁 FILE STATISTICS\n")
+        w(f"  Total files: {files['total_files']}\n")
         if files.get("by_extension"):
-            report.append("  Top file types:")
+            w("  Top file types:\n")
             sorted_exts = sorted(files["by_extension"].items(), key=lambda x: x[1], reverse=True)[:5]
             for ext, count in sorted_exts:
-                report.append(f"    {ext}: {count}")
-        report.append("")
+                w(f"    {ext}: {count}\n")
+        w("\n")
     
     # Alerts
     alerts = check_alerts(health)
     if alerts:
-        report.append("🚨 ALERTS")
+        w("🚨 ALERTS\n")
         for alert in alerts:
-            report.append(f"  {alert}")
-        report.append("")
+            w(f"  {alert}\n")
+        w("\n")
     else:
-        report.append("✅ All systems nominal")
-        report.append("")
+        w("✅ All systems nominal\n")
+        w("\n")
     
-    report.append("=" * 50)
+    w("=" * 50)  # no trailing newline, print() adds it
     
-    return '\n'.join(report), health
+    return buf.getvalue(), health
 
 if __name__ == "__main__":
-    report, health = generate_report()
+    os.environ.setdefault('TZ', 'America/St_Johns')
+    time.tzset()
+    
+    if "--alerts" in sys.argv:
+        # Alert check only reads memory and file stats; skips openclaw status
+        alerts = check_alerts(HealthSnapshot())
+        print("\n".join(alerts) if alerts else "✅ All systems nominal")
+        exit(1 if alerts else 0)
+    
+    report, health = generate_report(force="--force" in sys.argv)
     print(report)
     
     # Return exit code based on alerts
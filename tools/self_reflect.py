@@ -1,7 +1,4 @@
 #!/usr/bin/env python3
-os.environ["TZ"] = "America/St_Johns"
-import time
-time.tzset()
 """
 Claw Self-Reflection Engine
 Analyzes my logs and behavior to generate insights
@@ -10,10 +7,17 @@ Analyzes my logs and behavior to generate insights
 import json
 import os
 import re
+import time
 from datetime import datetime, timedelta
 from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
 from pathlib import Path
 
+if "TZ" not in os.environ:
+    os.environ["TZ"] = "America/St_Johns"
+    time.tzset()
+
 WORKSPACE = "/config/clawd"
 MEMORY_DIR = os.path.join(WORKSPACE, "memory")
 LOG_FILES = [
@@ -22,6 +26,157 @@ LOG_FILES = [
     os.path.join(MEMORY_DIR, "operation_log.jsonl"),
     os.path.join(MEMORY_DIR, "webwatch_log.jsonl"),
 ]
+# Outside the git-tracked workspace, like the other /tmp caches
+OFFSETS_FILE = "/tmp/claw_reflect_offsets.json"
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+ERROR_STATUSES = {'error', 'failed', 'timeout'}
+FAILED_STATUSES = {'error', 'failed'}
+SUCCESS_STATUSES = {'success', 'completed', 'ok'}
+
+# One alternative per bucket, each scanning the whole message in turn, so
+# bucket priority (not position in the message) decides like the old if/elif chain
+ERROR_BUCKET_RE = re.compile(
+    r'(?:.*?(timeout)|.*?(connection|refused)|.*?(permission)|.*?(not found))',
+    re.IGNORECASE | re.DOTALL,
+)
+ERROR_BUCKETS = (None, 'Timeouts', 'Connection issues', 'Permission denied', 'Missing resources')
+
+@dataclass
+class LogSummary:
+    """Everything the analyzers need, gathered in one pass over the entries"""
+    total: int = 0
+    error_count: int = 0
+    failed_count: int = 0
+    error_types: Counter = field(default_factory=Counter)
+    success_count: int = 0
+    success_actions: Counter = field(default_factory=Counter)
+    repeated_actions: Counter = field(default_factory=Counter)
+    health_count: int = 0
+    health_warnings: int = 0
+    health_criticals: int = 0
+    recent_count: int = 0  # depends on the clock, so never persisted
+    
+    def merge(self, other):
+        """Add another summary's counts to this one"""
+        for f in fields(self):
+            if f.name == 'recent_count':
+                continue
+            mine = getattr(self, f.name)
+            theirs = getattr(other, f.name)
+            if isinstance(mine, Counter):
+                mine.update(theirs)
+            else:
+                setattr(self, f.name, mine + theirs)
+    
+    def to_dict(self):
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != 'recent_count'}
+    
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls()
+        for f in fields(cls):
+            if f.name in data and f.name != 'recent_count':
+                value = data[f.name]
+                setattr(summary, f.name, Counter(value) if f.default_factory is Counter else value)
+        return summary
+
+@dataclass
+class LogIndex:
+    """Summary of every logged entry plus the times of the last day's, carried over between runs"""
+    summary: LogSummary
+    recent: list  # epoch seconds of entries from the last 24 hours
+
+def classify_error(error_msg):
+    """Map an error message to one of the ERROR_BUCKETS names"""
+    m = ERROR_BUCKET_RE.match(error_msg)
+    return ERROR_BUCKETS[m.lastindex] if m else 'Other errors'
+
+def parse_ts(ts):
+    """ISO timestamp -> epoch seconds (naive means local time), None if unparseable"""
+    if ts[-1:] == 'Z':
+        ts = ts[:-1] + '+00:00'
+    try:
+        return datetime.fromisoformat(ts).timestamp()
+    except ValueError:
+        return None
+
+def summarize_entries(entries):
+    """Classify every entry once so the analyzers don't rescan the list"""
+    summary = LogSummary(total=len(entries))
+    
+    for e in entries:
+        status = e.get('status')
+        action = e.get('action') or ''
+        
+        if status in ERROR_STATUSES:
+            summary.error_count += 1
+            summary.error_types[classify_error(e.get('error', '') or e.get('details', ''))] += 1
+            if status in FAILED_STATUSES:
+                summary.failed_count += 1
+        elif status in SUCCESS_STATUSES:
+            summary.success_count += 1
+            if 'action' in e:
+                # str() so keys survive the JSON round trip through OFFSETS_FILE
+                summary.success_actions[str(e.get('action', 'unknown'))] += 1
+        
+        if action:
+            # Normalize action names
+            summary.repeated_actions[re.sub(r'_(check|restart|verify)_', '_', action)] += 1
+            if 'disk' in action or 'memory' in action:
+                summary.health_count += 1
+                status_text = status or ''
+                if 'warning' in status_text:
+                    summary.health_warnings += 1
+                if 'critical' in status_text:
+                    summary.health_criticals += 1
+    
+    return summary
+
+def recent_times(entries, now_ts):
+    """Epoch seconds of the entries from the last 24 hours"""
+    recent = []
+    for e in entries:
+        ts = e.get('timestamp')
+        if isinstance(ts, str):
+            epoch = parse_ts(ts)
+            if epoch is not None and now_ts - epoch < 86400:
+                recent.append(epoch)
+    return recent
+
+def load_offsets():
+    """Load the per-file offsets and summary from the last run"""
+    try:
+        with open(OFFSETS_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_offsets(state):
+    tmp = OFFSETS_FILE + '.tmp'
+    try:
+        with open(tmp, 'w') as f:
+            json.dump(state, f, separators=(',', ':'))
+        os.replace(tmp, OFFSETS_FILE)
+    except OSError as e:
+        print(f"Warning: Could not save reflection offsets: {e}")
+
+def read_new_entries(path, offset, entries):
+    """Parse complete lines after offset into entries; return the new offset"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    # Leave a half-written last line for the next run
+    end = data.rfind(b'\n') + 1
+    # Decode the chunk once; json.loads on str skips per-line encoding detection
+    for line in data[:end].decode('utf-8', 'replace').split('\n'):
+        if line:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                pass
+    return offset + end
 
 class SelfReflectionEngine:
     def __init__(self):
@@ -29,49 +184,63 @@ class SelfReflectionEngine:
         self.patterns = defaultdict(list)
         self.errors = []
         self.successes = []
+        self.entry_count = 0
         
-    def load_logs(self):
-        """Load all log files"""
-        all_entries = []
+    def load_logs(self, now=None):
+        """Load the log index, reading only what was appended since the last run.
+
+        OFFSETS_FILE keeps the offset reached in each log, the summary of
+        everything before it and the times of the last day's entries. A log
+        that was rotated or rewritten (new inode, or shorter than its offset)
+        forces a full reread.
+        """
+        now_ts = (now or datetime.now()).timestamp()
+        state = load_offsets()
+        offsets = state.get("offsets", {})
+        
+        stats = {}
         for log_file in LOG_FILES:
-            if os.path.exists(log_file):
-                with open(log_file, 'r') as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line.strip())
-                            all_entries.append(entry)
-                        except:
-                            pass
-        return sorted(all_entries, key=lambda x: x.get('timestamp', ''))
+            try:
+                stats[log_file] = os.stat(log_file)
+            except OSError:
+                pass
+        
+        rebuild = "summary" not in state
+        for log_file, (ino, offset) in offsets.items():
+            st = stats.get(log_file)
+            if st is None or st.st_ino != ino or st.st_size < offset:
+                rebuild = True
+                break
+        
+        new_entries = []
+        new_offsets = {}
+        for log_file, st in stats.items():
+            offset = 0 if rebuild else offsets.get(log_file, (0, 0))[1]
+            try:
+                new_offsets[log_file] = [st.st_ino, read_new_entries(log_file, offset, new_entries)]
+            except OSError:
+                continue
+        
+        # Only the new entries are classified; the saved summary covers the rest
+        summary = LogSummary() if rebuild else LogSummary.from_dict(state["summary"])
+        summary.merge(summarize_entries(new_entries))
+        recent = [] if rebuild else state.get("recent", [])
+        recent = [t for t in recent if now_ts - t < 86400] + recent_times(new_entries, now_ts)
+        
+        save_offsets({"offsets": new_offsets, "summary": summary.to_dict(), "recent": recent})
+        return LogIndex(summary, recent)
     
-    def analyze_error_patterns(self, entries):
+    def analyze_error_patterns(self, summary):
         """Find patterns in errors"""
-        errors = [e for e in entries if e.get('status') in ['error', 'failed', 'timeout']]
-        
-        if not errors:
+        if not summary.error_count:
             return ["✓ No errors detected — you're doing great!"]
         
         insights = []
+        error_types = summary.error_types
         
-        # Group by error type
-        error_types = Counter()
-        for e in errors:
-            error_msg = e.get('error', '') or e.get('details', '')
-            # Extract error type
-            if 'timeout' in error_msg.lower():
-                error_types['Timeouts'] += 1
-            elif 'connection' in error_msg.lower() or 'refused' in error_msg.lower():
-                error_types['Connection issues'] += 1
-            elif 'permission' in error_msg.lower():
-                error_types['Permission denied'] += 1
-            elif 'not found' in error_msg.lower():
-                error_types['Missing resources'] += 1
-            else:
-                error_types['Other errors'] += 1
-        
-        insights.append(f"📊 Error breakdown (last {len(errors)} errors):")
+        insights.append(f"📊 Error breakdown (last {summary.error_count} errors):")
         for error_type, count in error_types.most_common():
-            pct = (count / len(errors)) * 100
+            pct = (count / summary.error_count) * 100
             insights.append(f"   • {error_type}: {count} ({pct:.0f}%)")
         
         # Recommendations
@@ -88,18 +257,18 @@ class SelfReflectionEngine:
         
         return insights
     
-    def analyze_success_patterns(self, entries):
+    def analyze_success_patterns(self, summary):
         """Find what's working well"""
-        successes = [e for e in entries if e.get('status') in ['success', 'completed', 'ok']]
+        successes = summary.success_count
         
-        if len(successes) < 3:
+        if successes < 3:
             return []
         
         insights = []
-        insights.append(f"\n✅ Success rate: {len(successes)}/{len(entries)} ({len(successes)/len(entries)*100:.0f}%)")
+        insights.append(f"\n✅ Success rate: {successes}/{summary.total} ({successes/summary.total*100:.0f}%)")
         
         # Most successful operations
-        operations = Counter(e.get('action', 'unknown') for e in successes if 'action' in e)
+        operations = summary.success_actions
         if operations:
             insights.append("\n🏆 Most successful operations:")
             for op, count in operations.most_common(3):
@@ -115,36 +284,40 @@ class SelfReflectionEngine:
             import subprocess
             # Get commits by hour
             result = subprocess.run(
-                ["git", "-C", WORKSPACE, "log", "--format=%H %ai", "--all"],
+                ["git", "-C", WORKSPACE, "log", "--format=%at", "--all"],
                 capture_output=True, text=True
             )
             
-            commits = []
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        dt = datetime.fromisoformat(parts[1].replace('Z', '+00:00'))
-                        commits.append(dt)
+            # Unix timestamps: hour and weekday come from localtime, no datetime needed
+            hours = Counter()
+            days = Counter()
+            first = last = None
+            commit_count = 0
+            for line in result.stdout.split():
+                ts = int(line)
+                local = time.localtime(ts)
+                hours[local.tm_hour] += 1
+                days[WEEKDAYS[local.tm_wday]] += 1
+                if first is None or ts < first:
+                    first = ts
+                if last is None or ts > last:
+                    last = ts
+                commit_count += 1
             
-            if commits:
+            if commit_count:
                 # Hour analysis
-                hours = Counter(c.hour for c in commits)
                 most_productive = hours.most_common(1)[0]
                 
                 insights.append(f"\n⏰ Most productive hour: {most_productive[0]}:00 ({most_productive[1]} commits)")
                 
                 # Day analysis
-                days = Counter(c.strftime('%A') for c in commits)
                 most_productive_day = days.most_common(1)[0]
                 insights.append(f"📅 Most productive day: {most_productive_day[0]} ({most_productive_day[1]} commits)")
                 
                 # Commit velocity
-                if len(commits) >= 2:
-                    first = min(commits)
-                    last = max(commits)
-                    days_active = (last - first).days or 1
-                    velocity = len(commits) / days_active
+                if commit_count >= 2:
+                    days_active = (last - first) // 86400 or 1
+                    velocity = commit_count / days_active
                     insights.append(f"🚀 Commit velocity: {velocity:.1f} commits/day")
                     
                     if velocity > 5:
@@ -157,53 +330,39 @@ class SelfReflectionEngine:
         
         return insights
     
-    def identify_repetition(self, entries):
+    def identify_repetition(self, summary):
         """Identify repetitive patterns that could be automated"""
         insights = []
         
-        # Group by similar operations
-        operations = defaultdict(list)
-        for e in entries:
-            action = e.get('action', '')
-            if action:
-                # Normalize action names
-                normalized = re.sub(r'_(check|restart|verify)_', '_', action)
-                operations[normalized].append(e)
-        
-        repetitive = {k: v for k, v in operations.items() if len(v) > 3}
+        repetitive = {k: v for k, v in summary.repeated_actions.items() if v > 3}
         
         if repetitive:
             insights.append("\n🔄 Repetitive patterns detected:")
-            for action, entries_list in sorted(repetitive.items(), key=lambda x: len(x[1]), reverse=True):
-                insights.append(f"   • '{action}' happens {len(entries_list)} times")
+            for action, count in sorted(repetitive.items(), key=lambda x: x[1], reverse=True):
+                insights.append(f"   • '{action}' happens {count} times")
                 if 'restart' in action or 'check' in action:
                     insights.append(f"     → Could this be a cron job or daemon?")
         
         return insights
     
-    def check_health_trends(self, entries):
+    def check_health_trends(self, summary):
         """Analyze health trends"""
         insights = []
         
-        health_entries = [e for e in entries if 'disk' in e.get('action', '') or 'memory' in e.get('action', '')]
-        
-        if health_entries:
+        if summary.health_count:
             # Check for degrading trends
-            warnings = [e for e in health_entries if 'warning' in e.get('status', '')]
-            criticals = [e for e in health_entries if 'critical' in e.get('status', '')]
-            
-            if criticals:
+            if summary.health_criticals:
                 insights.append("\n🚨 CRITICAL: Health issues detected!")
-                insights.append(f"   {len(criticals)} critical alerts in recent history")
+                insights.append(f"   {summary.health_criticals} critical alerts in recent history")
                 insights.append("   → Immediate attention needed")
-            elif warnings:
-                insights.append(f"\n⚠️  {len(warnings)} health warnings — keep an eye on resources")
+            elif summary.health_warnings:
+                insights.append(f"\n⚠️  {summary.health_warnings} health warnings — keep an eye on resources")
             else:
                 insights.append("\n✓ Health trends look good")
         
         return insights
     
-    def generate_recommendations(self, entries):
+    def generate_recommendations(self, summary):
         """Generate actionable recommendations"""
         insights = []
         insights.append("\n" + "="*50)
@@ -211,23 +370,20 @@ class SelfReflectionEngine:
         insights.append("="*50)
         
         # Based on error patterns
-        errors = [e for e in entries if e.get('status') in ['error', 'failed']]
-        if len(errors) > len(entries) * 0.3:  # More than 30% error rate
+        if summary.failed_count > summary.total * 0.3:  # More than 30% error rate
             insights.append("1. Your error rate is high. Consider:")
             insights.append("   → Adding more robust error handling")
             insights.append("   → Pre-checking conditions before operations")
             insights.append("   → Building a 'dry run' mode for testing")
         
         # Based on timing
-        now = datetime.now()
-        recent_entries = [e for e in entries if 'timestamp' in e and 
-                         (now - datetime.fromisoformat(e['timestamp'].replace('Z', '+00:00'))).days < 1]
+        recent_count = summary.recent_count
         
-        if len(recent_entries) < 5:
+        if recent_count < 5:
             insights.append("\n2. Low activity in last 24 hours:")
             insights.append("   → Time to build something new?")
             insights.append("   → Review your cron jobs — are they running?")
-        elif len(recent_entries) > 50:
+        elif recent_count > 50:
             insights.append("\n2. High activity detected! 🚀")
             insights.append("   → Don't forget to commit regularly")
             insights.append("   → Take breaks — quality over quantity")
@@ -248,33 +404,36 @@ class SelfReflectionEngine:
         print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("")
         
-        entries = self.load_logs()
-        
-        if not entries:
-            print("No log entries found. Start logging your operations!")
-            return
-        
-        print(f"📊 Analyzed {len(entries)} log entries")
-        print("")
-        
-        # Run all analyses
-        for insight in self.analyze_error_patterns(entries):
-            print(insight)
-        
-        for insight in self.analyze_success_patterns(entries):
-            print(insight)
-        
-        for insight in self.analyze_git_patterns():
-            print(insight)
-        
-        for insight in self.check_health_trends(entries):
-            print(insight)
-        
-        for insight in self.identify_repetition(entries):
-            print(insight)
+        # git log is a subprocess and doesn't need the entries, so it runs
+        # in the background while the logs are loaded and analyzed
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            git_future = pool.submit(self.analyze_git_patterns)
+            
+            index = self.load_logs()
+            summary = index.summary
+            self.entry_count = summary.total
+            
+            if not summary.total:
+                print("No log entries found. Start logging your operations!")
+                return
+            
+            print(f"📊 Analyzed {summary.total} log entries")
+            print("")
+            
+            # The index already carries the per-entry classification
+            summary.recent_count = len(index.recent)
+            errors = self.analyze_error_patterns(summary)
+            successes = self.analyze_success_patterns(summary)
+            health = self.check_health_trends(summary)
+            repetition = self.identify_repetition(summary)
+            recommendations = self.generate_recommendations(summary)
+            
+            # Print in the usual order, with git between successes and health
+            sections = [errors, successes, git_future.result(), health, repetition, recommendations]
         
-        for insight in self.generate_recommendations(entries):
-            print(insight)
+        for insights in sections:
+            for insight in insights:
+                print(insight)
         
         print("")
         print("="*50)
@@ -291,11 +450,11 @@ class SelfReflectionEngine:
         entry = {
             "timestamp": datetime.now().isoformat(),
             "type": "self_reflection",
-            "entry_count": len(self.load_logs())
+            "entry_count": self.entry_count
         }
         
         with open(reflection_file, 'a') as f:
-            f.write(json.dumps(entry) + '\n')
+            f.write(json.dumps(entry, separators=(',', ':')) + '\n')
 
 def main():
     engine = SelfReflectionEngine()
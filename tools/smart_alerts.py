@@ -6,16 +6,11 @@ Monitors logs and sends alerts only for critical issues
 
 import json
 import os
-import subprocess
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
-os.environ["TZ"] = "America/St_Johns"
-try:
-    time.tzset()
-except Exception:
-    pass
+from jsonl_log import tail_jsonl
 
 WORKSPACE = "/config/clawd"
 ALERT_STATE_FILE = os.path.join(WORKSPACE, "data", "alert_state.json")
@@ -27,16 +22,20 @@ LOG_FILES = [
 
 def load_alert_state():
     """Load previous alert state"""
-    if os.path.exists(ALERT_STATE_FILE):
+    try:
         with open(ALERT_STATE_FILE, 'r') as f:
             return json.load(f)
-    return {"last_alerts": {}, "alert_count": 0}
+    except (FileNotFoundError, json.JSONDecodeError):
+        # Missing or torn file: start fresh rather than failing every tick
+        return {"last_alerts": {}, "alert_count": 0}
 
 def save_alert_state(state):
-    """Save alert state"""
+    """Save alert state atomically so a killed or racing run can't truncate it"""
     os.makedirs(os.path.dirname(ALERT_STATE_FILE), exist_ok=True)
-    with open(ALERT_STATE_FILE, 'w') as f:
+    tmp = f"{ALERT_STATE_FILE}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
         json.dump(state, f)
+    os.replace(tmp, ALERT_STATE_FILE)
 
 def should_alert(error_key, state):
     """Determine if we should send an alert (rate limiting)"""
@@ -58,30 +57,28 @@ def check_for_critical_issues():
     # Check network monitor
     log_file = os.path.join(WORKSPACE, "memory/network_monitor_log.jsonl")
     if os.path.exists(log_file):
-        with open(log_file, 'r') as f:
-            lines = f.readlines()
-            # Check last 5 entries
-            for line in lines[-5:]:
-                try:
-                    entry = json.loads(line)
-                    service_name = entry.get("service")
-                    if entry.get("status") == "DOWN" and service_name:
-                        if service_name in {"Chromium Debug"}:
-                            continue
-                        alerts.append({
-                            "level": "CRITICAL",
-                            "service": service_name,
-                            "message": f"{service_name} is DOWN",
-                            "key": f"service_down_{service_name}"
-                        })
-                except:
-                    pass
+        # Check last 5 entries
+        for entry in tail_jsonl(log_file, 5):
+            try:
+                service_name = entry.get("service")
+                if entry.get("status") == "DOWN" and service_name:
+                    if service_name in {"Chromium Debug"}:
+                        continue
+                    alerts.append({
+                        "level": "CRITICAL",
+                        "service": service_name,
+                        "message": f"{service_name} is DOWN",
+                        "key": f"service_down_{service_name}"
+                    })
+            except:
+                pass
     
     # Check for disk space critical
     try:
-        result = subprocess.run(["df", "-P", "/config"], capture_output=True, text=True, timeout=8)
-        usage_field = result.stdout.strip().splitlines()[1].split()[4].replace('%', '')
-        disk_pct = int(usage_field)
+        # Same Use% df reports: used / (used + available to non-root), rounded up
+        st = os.statvfs("/config")
+        used = st.f_blocks - st.f_bfree
+        disk_pct = -(-used * 100 // (used + st.f_bavail))
         if disk_pct > 90:
             alerts.append({
                 "level": "CRITICAL",
@@ -89,30 +86,27 @@ def check_for_critical_issues():
                 "message": f"Disk usage critical: {disk_pct}%",
                 "key": "disk_space_critical"
             })
-    except (IndexError, ValueError, subprocess.TimeoutExpired):
+    except (OSError, ZeroDivisionError):
         pass
     
     # Check for repeated operation failures
     log_file = os.path.join(WORKSPACE, "memory/operation_log.jsonl")
     if os.path.exists(log_file):
-        with open(log_file, 'r') as f:
-            lines = f.readlines()
-            recent_failures = []
-            for line in lines[-10:]:
-                try:
-                    entry = json.loads(line)
-                    if entry.get("status") in ["failed", "error"]:
-                        recent_failures.append(entry)
-                except:
-                    pass
-            
-            if len(recent_failures) >= 5:  # 5+ failures in last 10 ops
-                alerts.append({
-                    "level": "WARNING",
-                    "service": "Operations",
-                    "message": f"High failure rate: {len(recent_failures)}/10 operations failed",
-                    "key": "high_failure_rate"
-                })
+        recent_failures = []
+        for entry in tail_jsonl(log_file, 10):
+            try:
+                if entry.get("status") in ["failed", "error"]:
+                    recent_failures.append(entry)
+            except:
+                pass
+        
+        if len(recent_failures) >= 5:  # 5+ failures in last 10 ops
+            alerts.append({
+                "level": "WARNING",
+                "service": "Operations",
+                "message": f"High failure rate: {len(recent_failures)}/10 operations failed",
+                "key": "high_failure_rate"
+            })
     
     return alerts
 
@@ -151,6 +145,12 @@ def generate_alert_report(alerts, state):
     return "\n".join(report)
 
 def main():
+    os.environ.setdefault("TZ", "America/St_Johns")
+    try:
+        time.tzset()
+    except Exception:
+        pass
+    
     print("🦅 Smart Alert System")
     print("=" * 50)
     
@@ -183,7 +183,7 @@ def main():
         
         log_file = os.path.join(WORKSPACE, "memory/alert_log.jsonl")
         with open(log_file, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+            f.write(json.dumps(log_entry, separators=(',', ':')) + '\n')
         
         # Return non-zero so cron knows to send alert
         return 1
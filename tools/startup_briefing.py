@@ -8,8 +8,11 @@ import os
 import time
 import subprocess
 import json
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from glob import glob
+
+from git_cache import commit_count, read_git_head
 
 # Set Newfoundland timezone
 os.environ['TZ'] = 'America/St_Johns'
@@ -18,14 +21,47 @@ time.tzset()
 WORKSPACE = "/config/clawd"
 MEMORY_DIR = os.path.join(WORKSPACE, "memory")
 
-def get_recent_memory():
+# Memoized helper results, keyed on the mtimes they were computed from
+_memory_cache = {"dir_mtime": None, "newest": None, "count": 0, "key": None, "value": None}
+_identity_cache = {"key": None, "value": None}
+
+def _scan_workspace():
+    """WORKSPACE's entries by name, read once and shared by the collectors"""
+    with os.scandir(WORKSPACE) as it:
+        return {entry.name: entry for entry in it}
+
+def _stat(entries, name, path):
+    """stat of path, reusing the scanned entry when there is one"""
+    entry = entries.get(name) if entries else None
+    return entry.stat() if entry is not None else os.stat(path)
+
+def get_recent_memory(entries=None):
     """Get the most recent memory file contents"""
     try:
-        files = sorted(glob(os.path.join(MEMORY_DIR, "*.md")), reverse=True)
-        if not files:
+        # A new or removed file bumps the directory's mtime
+        dir_mtime = _stat(entries, "memory", MEMORY_DIR).st_mtime_ns
+        if _memory_cache["dir_mtime"] != dir_mtime:
+            # One pass for the count and the greatest (newest dated) name;
+            # hidden names are skipped like glob's *.md did
+            newest, count = None, 0
+            with os.scandir(MEMORY_DIR) as it:
+                for entry in it:
+                    name = entry.name
+                    if name.endswith('.md') and not name.startswith('.'):
+                        count += 1
+                        if newest is None or name > newest:
+                            newest = name
+            _memory_cache.update(dir_mtime=dir_mtime, newest=newest, count=count)
+        newest = _memory_cache["newest"]
+        if newest is None:
             return "No memory files found"
         
-        with open(files[0], 'r') as f:
+        path = os.path.join(MEMORY_DIR, newest)
+        key = (dir_mtime, os.stat(path).st_mtime_ns)
+        if _memory_cache["key"] == key:
+            return _memory_cache["value"]
+        
+        with open(path, 'r') as f:
             content = f.read()
         
         # Get just the summary/first part
@@ -37,23 +73,95 @@ def get_recent_memory():
             if len(summary) >= 5:
                 break
         
-        return {
-            "file": os.path.basename(files[0]),
+        result = {
+            "file": newest,
             "summary": '\n'.join(summary[:5]),
-            "total_files": len(files)
+            "total_files": _memory_cache["count"]
         }
+        _memory_cache["key"] = key
+        _memory_cache["value"] = result
+        return result
     except Exception as e:
         return {"error": str(e)}
 
+def read_loose_commit(git_dir, sha):
+    """Author time and subject of a commit stored as a loose object, else None"""
+    try:
+        with open(os.path.join(git_dir, "objects", sha[:2], sha[2:]), 'rb') as f:
+            raw = zlib.decompress(f.read())
+    except FileNotFoundError:
+        return None  # packed; let git read it
+    header, _, body = raw.partition(b"\0")
+    if not header.startswith(b"commit "):
+        return None
+    headers, _, message = body.partition(b"\n\n")
+    author_time = None
+    for line in headers.split(b"\n"):
+        if line.startswith(b"author "):
+            author_time = int(line.rsplit(b" ", 2)[1])
+            break
+    # %s: the first paragraph, folded onto one line
+    subject = []
+    for line in message.decode('utf-8', 'replace').split('\n'):
+        if not line.strip():
+            break
+        subject.append(line.strip())
+    return author_time, ' '.join(subject)
+
+def git_relative_date(ts, now):
+    """Same wording as git's %ar (date.c show_date_relative)"""
+    def ago(n, unit):
+        return f"{n} {unit}{'' if n == 1 else 's'} ago"
+    diff = int(now - ts)
+    if diff < 0:
+        return "in the future"
+    if diff < 90:
+        return ago(diff, "second")
+    diff = (diff + 30) // 60
+    if diff < 90:
+        return ago(diff, "minute")
+    diff = (diff + 30) // 60
+    if diff < 36:
+        return ago(diff, "hour")
+    diff = (diff + 12) // 24
+    if diff < 14:
+        return ago(diff, "day")
+    if diff < 70:
+        return ago((diff + 3) // 7, "week")
+    if diff < 365:
+        return ago((diff + 15) // 30, "month")
+    if diff < 1825:
+        total_months = (diff * 12 * 2 + 365) // (365 * 2)
+        years, months = divmod(total_months, 12)
+        if months:
+            return f"{years} year{'' if years == 1 else 's'}, {ago(months, 'month')}"
+        return ago(years, "year")
+    return ago((diff + 183) // 365, "year")
+
+def read_last_commit():
+    """[hash, subject, relative date] of HEAD without spawning git, or None"""
+    git_dir = os.path.join(WORKSPACE, ".git")
+    try:
+        sha = read_git_head(git_dir)
+        commit = read_loose_commit(git_dir, sha) if sha else None
+    except (OSError, ValueError, IndexError, zlib.error):
+        return None
+    if not commit or commit[0] is None:
+        return None
+    return [sha[:7], commit[1], git_relative_date(commit[0], time.time())]
+
 def get_git_status():
     """Get current git state"""
     try:
-        # Get last commit
-        result = subprocess.run(
-            ["git", "-C", WORKSPACE, "log", "-1", "--format=%h|%s|%ar"],
-            capture_output=True, text=True
-        )
-        last_commit = result.stdout.strip().split('|') if result.stdout.strip() else ["none", "no commits", "never"]
+        # Last commit is read in-process when possible and the commit count
+        # is cached per HEAD, so usually only git status runs
+        last_commit = read_last_commit()
+        if last_commit is None:
+            result = subprocess.run(
+                ["git", "-C", WORKSPACE, "log", "-1", "--format=%h|%s|%ar"],
+                capture_output=True, text=True
+            )
+            last_commit = result.stdout.strip().split('|') if result.stdout.strip() else ["none", "no commits", "never"]
         
         # Check for uncommitted changes
         result2 = subprocess.run(
@@ -63,11 +171,7 @@ def get_git_status():
         uncommitted = len([l for l in result2.stdout.strip().split('\n') if l.strip()]) if result2.stdout.strip() else 0
         
         # Total commits
-        result3 = subprocess.run(
-            ["git", "-C", WORKSPACE, "rev-list", "--count", "HEAD"],
-            capture_output=True, text=True
-        )
-        total_commits = result3.stdout.strip() if result3.stdout.strip() else "0"
+        total_commits = str(commit_count(WORKSPACE))
         
         return {
             "last_hash": last_commit[0] if len(last_commit) > 0 else "unknown",
@@ -90,123 +194,173 @@ def get_cron_status():
     except Exception as e:
         return f"Error: {str(e)}"
 
-def get_project_stats():
+def count_project_files(path):
+    """Number of regular files under path (like find -type f, in-process)"""
+    count = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_file(follow_symlinks=False):
+                        count += 1
+                    elif entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+        except OSError:
+            # Unreadable directory: find skipped it too
+            continue
+    return count
+
+def get_project_stats(entries=None):
     """Get stats on my projects"""
-    projects = []
+    names = []
     try:
-        for item in os.listdir(WORKSPACE):
-            item_path = os.path.join(WORKSPACE, item)
-            if os.path.isdir(item_path) and item not in [".git", "memory", "node_modules", "__pycache__"]:
-                git_dir = os.path.join(item_path, ".git")
+        if entries is None:
+            entries = _scan_workspace()
+        for item, entry in entries.items():
+            if entry.is_dir() and item not in [".git", "memory", "node_modules", "__pycache__"]:
+                git_dir = os.path.join(entry.path, ".git")
                 if os.path.exists(git_dir):
-                    # Count files
-                    try:
-                        result = subprocess.run(
-                            ["find", item_path, "-type", "f"],
-                            capture_output=True, text=True
-                        )
-                        file_count = len([l for l in result.stdout.strip().split('\n') if l.strip()])
-                    except:
-                        file_count = "?"
-                    
-                    projects.append({
-                        "name": item,
-                        "files": file_count
-                    })
+                    names.append(item)
     except Exception as e:
         return [{"error": str(e)}]
     
-    return projects
+    if not names:
+        return []
+    
+    # Count every project's files at once rather than one find after another
+    with ThreadPoolExecutor(max_workers=min(8, len(names))) as pool:
+        counts = pool.map(count_project_files, [os.path.join(WORKSPACE, n) for n in names])
+        return [{"name": name, "files": count} for name, count in zip(names, counts)]
 
-def get_identity():
+def get_identity(entries=None):
     """Load my identity"""
     try:
-        with open(os.path.join(WORKSPACE, "IDENTITY.md"), 'r') as f:
+        path = os.path.join(WORKSPACE, "IDENTITY.md")
+        st = _stat(entries, "IDENTITY.md", path)
+        key = (st.st_mtime_ns, st.st_size)
+        if _identity_cache["key"] == key:
+            return _identity_cache["value"]
+        
+        with open(path, 'r') as f:
             content = f.read()
         
         # Parse simple key-value pairs
         identity = {}
-        for line in content.split('\n'):
-            if ':' in line and not line.startswith('#'):
-                key, val = line.split(':', 1)
-                identity[key.strip('- ')] = val.strip()
+        for line in content.splitlines():
+            if line.startswith('#'):
+                continue
+            name, sep, val = line.partition(':')
+            if sep:
+                identity[name.strip('- ')] = val.strip()
         
+        _identity_cache["key"] = key
+        _identity_cache["value"] = identity
         return identity
     except Exception as e:
         return {"error": str(e)}
 
+_RULE = "=" * 50
+
+# Fixed briefing text; the variable sections are rendered by the _*_block
+# helpers below and substituted in one format_map call
+_BRIEFING_TEMPLATE = (
+    _RULE + "\n"
+    "🦅 CLAW STARTUP BRIEFING\n"
+    + _RULE + "\n"
+    "📅 {timestamp} NST (Newfoundland Time)\n"
+    "\n"
+    "{identity}"
+    "📝 GIT STATUS\n"
+    "{git}\n"
+    "\n"
+    "🧠 RECENT MEMORY\n"
+    "{memory}\n"
+    "\n"
+    "📁 PROJECTS\n"
+    "{projects}"
+    "\n"
+    "🎯 POTENTIAL ACTIONS\n"
+    "{actions}"
+    "  → Check cron jobs: openclaw cron list\n"
+    "  → Review memory files in /config/clawd/memory/\n"
+    "  → Read USER.md to remember Robert's context\n"
+    "\n"
+    + _RULE + "\n"
+    "Ready to work. 🦅\n"
+    + _RULE
+)
+
+def _identity_block(identity):
+    if not identity or "error" in identity:
+        return ""
+    lines = [f"  {k}: {v}\n" for k, v in identity.items() if v]
+    return "👤 IDENTITY\n" + "".join(lines) + "\n"
+
+def _git_block(git):
+    if "error" in git:
+        return f"  Error: {git.get('error', 'unknown')}"
+    if git.get('uncommitted_changes', 0) > 0:
+        state = f"  ⚠️  {git['uncommitted_changes']} uncommitted changes"
+    else:
+        state = "  ✓ Working directory clean"
+    return (
+        f"  Total commits: {git.get('total_commits', '?')}\n"
+        f"  Last commit: {git.get('last_hash', '?')} - {git.get('last_message', '?')}\n"
+        f"  Committed: {git.get('last_when', '?')}\n"
+        + state
+    )
+
+def _memory_block(memory):
+    if not isinstance(memory, dict) or "error" in memory:
+        return f"  {memory if isinstance(memory, str) else memory.get('error', 'unknown')}"
+    lines = [
+        f"  File: {memory.get('file', '?')}",
+        f"  Total memory files: {memory.get('total_files', '?')}",
+        "  Summary:",
+    ]
+    lines.extend(f"    {line}" for line in memory.get('summary', '').split('\n') if line.strip())
+    return "\n".join(lines)
+
+def _projects_block(projects):
+    return "".join(f"  {p['name']}: ~{p['files']} files\n" for p in projects if "error" not in p)
+
+def _actions_block(git):
+    if isinstance(git, dict) and git.get('uncommitted_changes', 0) > 0:
+        return f"  → Commit {git['uncommitted_changes']} pending changes\n"
+    return ""
+
 def generate_briefing():
     """Generate a startup briefing"""
     now = datetime.now()
     
-    memory = get_recent_memory()
-    git = get_git_status()
-    projects = get_project_stats()
-    identity = get_identity()
-    
-    briefing = []
-    briefing.append("=" * 50)
-    briefing.append("🦅 CLAW STARTUP BRIEFING")
-    briefing.append("=" * 50)
-    briefing.append(f"📅 {now.strftime('%Y-%m-%d %H:%M:%S')} NST (Newfoundland Time)")
-    briefing.append("")
-    
-    # Identity
-    if identity and "error" not in identity:
-        briefing.append("👤 IDENTITY")
-        for k, v in identity.items():
-            if v:
-                briefing.append(f"  {k}: {v}")
-        briefing.append("")
-    
-    # Git status
-    briefing.append("📝 GIT STATUS")
-    if "error" not in git:
-        briefing.append(f"  Total commits: {git.get('total_commits', '?')}")
-        briefing.append(f"  Last commit: {git.get('last_hash', '?')} - {git.get('last_message', '?')}")
-        briefing.append(f"  Committed: {git.get('last_when', '?')}")
-        if git.get('uncommitted_changes', 0) > 0:
-            briefing.append(f"  ⚠️  {git['uncommitted_changes']} uncommitted changes")
-        else:
-            briefing.append(f"  ✓ Working directory clean")
-    else:
-        briefing.append(f"  Error: {git.get('error', 'unknown')}")
-    briefing.append("")
-    
-    # Recent memory
-    briefing.append("🧠 RECENT MEMORY")
-    if isinstance(memory, dict) and "error" not in memory:
-        briefing.append(f"  File: {memory.get('file', '?')}")
-        briefing.append(f"  Total memory files: {memory.get('total_files', '?')}")
-        briefing.append("  Summary:")
-        for line in memory.get('summary', '').split('\n'):
-            if line.strip():
-                briefing.append(f"    {line}")
-    else:
-        briefing.append(f"  {memory if isinstance(memory, str) else memory.get('error', 'unknown')}")
-    briefing.append("")
-    
-    # Projects
-    briefing.append("📁 PROJECTS")
-    for p in projects:
-        if "error" not in p:
-            briefing.append(f"  {p['name']}: ~{p['files']} files")
-    briefing.append("")
-    
-    # Actions needed
-    briefing.append("🎯 POTENTIAL ACTIONS")
-    if isinstance(git, dict) and git.get('uncommitted_changes', 0) > 0:
-        briefing.append(f"  → Commit {git['uncommitted_changes']} pending changes")
-    briefing.append("  → Check cron jobs: openclaw cron list")
-    briefing.append("  → Review memory files in /config/clawd/memory/")
-    briefing.append("  → Read USER.md to remember Robert's context")
-    briefing.append("")
+    # One directory read of WORKSPACE serves identity, memory and projects;
+    # if it fails the collectors report their own errors
+    try:
+        entries = _scan_workspace()
+    except OSError:
+        entries = None
     
-    briefing.append("=" * 50)
-    briefing.append("Ready to work. 🦅")
-    briefing.append("=" * 50)
+    # The collectors are independent and mostly wait on subprocesses or
+    # disk, so run them side by side
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        memory_future = pool.submit(get_recent_memory, entries)
+        git_future = pool.submit(get_git_status)
+        projects_future = pool.submit(get_project_stats, entries)
+        identity_future = pool.submit(get_identity, entries)
+        memory = memory_future.result()
+        git = git_future.result()
+        projects = projects_future.result()
+        identity = identity_future.result()
     
-    return '\n'.join(briefing)
+    return _BRIEFING_TEMPLATE.format_map({
+        "timestamp": now.strftime('%Y-%m-%d %H:%M:%S'),
+        "identity": _identity_block(identity),
+        "git": _git_block(git),
+        "memory": _memory_block(memory),
+        "projects": _projects_block(projects),
+        "actions": _actions_block(git),
+    })
 
 if __name__ == "__main__":
     print(generate_briefing())
@@ -6,7 +6,10 @@ import json
 import time
 from datetime import datetime
 
+from jsonl_log import JsonlLogger
+
 WALLET_ADDRESS = "0x1867c3293105155854Ae9373C5f555939F942A89"
+_status_log = JsonlLogger("/config/clawd/wallet_monitor.jsonl")
 
 def check_balance():
     """Check ETH balance on mainnet via public RPC."""
@@ -47,8 +50,7 @@ def log_status():
         "status": "active" if balance is not None else "error"
     }
     
-    with open("/config/clawd/wallet_monitor.jsonl", "a") as f:
-        f.write(json.dumps(status) + "\n")
+    _status_log.log(status)
     
     return balance
 
@@ -7,25 +7,52 @@ Claw Weather Intelligence
 Advanced weather monitoring and alerts
 """
 
-import subprocess
+import http.client
 import json
 import os
 from datetime import datetime
 
+from jsonl_log import JsonlLogger
+
 LOCATION = "Holyrood,Newfoundland"
 LOG_FILE = "/config/clawd/memory/weather_log.jsonl"
+_weather_log = JsonlLogger(LOG_FILE)
+WTTR_HOST = "wttr.in"
+
+_wttr_conn = None
+
+def wttr_get(query, timeout=30):
+    """GET wttr.in/<query>, reusing one kept-alive HTTPS connection"""
+    global _wttr_conn
+    for attempt in range(2):
+        if _wttr_conn is None:
+            _wttr_conn = http.client.HTTPSConnection(WTTR_HOST, timeout=timeout)
+        reused = _wttr_conn.sock is not None
+        try:
+            # wttr.in tailors output to the client; keep answering as it did for curl
+            _wttr_conn.request("GET", f"/{query}", headers={"User-Agent": "curl/8.0"})
+            resp = _wttr_conn.getresponse()
+            body = resp.read()
+        except (http.client.HTTPException, OSError):
+            _wttr_conn.close()
+            _wttr_conn = None
+            # Only a kept-alive connection the server dropped is worth a retry
+            if attempt or not reused:
+                raise
+            continue
+        if resp.will_close:
+            _wttr_conn.close()
+            _wttr_conn = None
+        return resp.status, body
 
 def get_weather_data():
     """Fetch weather data from wttr.in"""
     try:
         # Get structured data
-        result = subprocess.run(
-            ["curl", "-s", f"wttr.in/{LOCATION}?format=j1"],
-            capture_output=True, text=True, timeout=30
-        )
+        status, body = wttr_get(f"{LOCATION}?format=j1")
         
-        if result.returncode == 0:
-            return json.loads(result.stdout)
+        if status == 200:
+            return json.loads(body)
         return None
     except:
         return None
@@ -33,17 +60,28 @@ def get_weather_data():
 def get_simple_weather():
     """Get simple weather string"""
     try:
-        result = subprocess.run(
-            ["curl", "-s", f"wttr.in/{LOCATION}?format=%C:+%t"],
-            capture_output=True, text=True, timeout=30
-        )
+        status, body = wttr_get(f"{LOCATION}?format=%C:+%t")
         
-        if result.returncode == 0:
-            return result.stdout.strip()
+        if status == 200:
+            return body.decode('utf-8', 'replace').strip()
         return None
     except:
         return None
 
+# (analysis field, test on its integer value, alert text)
+SEVERE_RULES = (
+    ('temperature', lambda t: t < -10, "Extreme cold: {}°C"),
+    ('temperature', lambda t: t > 30, "Extreme heat: {}°C"),
+    ('wind_speed', lambda w: w > 50, "High winds: {} km/h"),
+    ('visibility', lambda v: v < 2, "Low visibility: {} km"),
+)
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
 def analyze_weather(weather_data):
     """Analyze weather conditions"""
     if not weather_data:
@@ -70,22 +108,12 @@ def analyze_weather(weather_data):
             'alerts': []
         }
         
-        # Check for severe conditions
-        if int(temp) < -10:
-            analysis['is_severe'] = True
-            analysis['alerts'].append(f"Extreme cold: {temp}°C")
-        
-        if int(temp) > 30:
-            analysis['is_severe'] = True
-            analysis['alerts'].append(f"Extreme heat: {temp}°C")
-        
-        if int(wind_speed) > 50:
-            analysis['is_severe'] = True
-            analysis['alerts'].append(f"High winds: {wind_speed} km/h")
-        
-        if int(visibility) < 2:
-            analysis['is_severe'] = True
-            analysis['alerts'].append(f"Low visibility: {visibility} km")
+        # Check for severe conditions; fields wttr.in left blank or non-numeric are skipped
+        for field, is_severe, message in SEVERE_RULES:
+            value = _to_int(analysis[field])
+            if value is not None and is_severe(value):
+                analysis['is_severe'] = True
+                analysis['alerts'].append(message.format(analysis[field]))
         
         return analysis
         
@@ -100,9 +128,7 @@ def log_weather(analysis):
         'analysis': analysis
     }
     
-    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-    with open(LOG_FILE, 'a') as f:
-        f.write(json.dumps(entry) + '\n')
+    _weather_log.log(entry)
 
 def generate_weather_summary(analysis):
     """Generate human-readable summary"""
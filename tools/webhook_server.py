@@ -6,7 +6,9 @@ External triggers and status queries via HTTP
 
 import json
 import os
+import socket
 import subprocess
+import threading
 import time
 from datetime import datetime
 
@@ -15,11 +17,64 @@ try:
     time.tzset()
 except Exception:
     pass
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 import urllib.parse
 
+from git_cache import commit_count, resolve_head
+from jsonl_log import JsonlLogger
+from port_probe import port_listening
+
 WORKSPACE = "/config/clawd"
 AUTH_TOKEN = os.environ.get('CLAW_WEBHOOK_TOKEN', 'dev-token-change-in-prod')
+DASHBOARD_PORT = 8080
+STATUS_TTL = 5  # seconds a /status body is reused
+_status_cache = {"expires": 0, "value": None}
+_status_lock = threading.Lock()  # requests are served on threads; refresh once
+_updates_log = JsonlLogger(f"{WORKSPACE}/memory/external_updates.jsonl")
+
+class GitHelper:
+    """Git queries for the API, rerun only when HEAD moves.
+
+    HEAD is read from .git without spawning git; the commit count comes
+    from git_cache, which only runs rev-list for a new HEAD.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self._lock = threading.Lock()
+        self._recent = []
+        self._recent_head = None
+
+    def recent_commits(self, n=10):
+        """`git log --oneline -n` lines, rerun only when HEAD moves"""
+        with self._lock:
+            head = resolve_head(self.repo)
+            if not head:
+                return []
+            if head != self._recent_head:
+                result = subprocess.run(
+                    ["git", "-C", self.repo, "log", "--oneline", f"-{n}", head],
+                    capture_output=True, text=True
+                )
+                self._recent = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
+                self._recent_head = head if result.returncode == 0 else None
+            return list(self._recent)
+
+    def commit_count(self):
+        """Commits reachable from HEAD, recounted only when HEAD changes"""
+        return commit_count(self.repo)
+
+git_helper = GitHelper(WORKSPACE)
+
+def dashboard_listening():
+    """Whether the dashboard port is open"""
+    listening = port_listening(DASHBOARD_PORT)
+    if listening is not None:
+        return listening
+    # No /proc/net (non-Linux): try connecting instead
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(1)
+        return sock.connect_ex(("127.0.0.1", DASHBOARD_PORT)) == 0
 
 class WebhookHandler(BaseHTTPRequestHandler):
     def log_message(self, format, *args):
@@ -92,25 +147,29 @@ class WebhookHandler(BaseHTTPRequestHandler):
     def handle_status(self):
         """Return full system status"""
         try:
-            commits = subprocess.run(
-                ["git", "-C", WORKSPACE, "rev-list", "--count", "HEAD"],
-                capture_output=True, text=True
-            ).stdout.strip()
-            
-            tools = len([f for f in os.listdir(f"{WORKSPACE}/tools") if f.endswith('.py')])
+            # Commit/tool counts and service state barely move between polls
+            with _status_lock:
+                if time.monotonic() >= _status_cache["expires"]:
+                    commits = git_helper.commit_count()
+                    
+                    tools = len([f for f in os.listdir(f"{WORKSPACE}/tools") if f.endswith('.py')])
+                    
+                    # Check services
+                    dashboard = dashboard_listening()
+                    
+                    _status_cache["value"] = {
+                        'commits': commits,
+                        'tools': tools,
+                        'services': {
+                            'dashboard': 'up' if dashboard else 'down',
+                        }
+                    }
+                    _status_cache["expires"] = time.monotonic() + STATUS_TTL
             
-            # Check services
-            ss_result = subprocess.run(["ss", "-tlnp"], capture_output=True, text=True, timeout=8)
-            dashboard = ":8080" in ss_result.stdout
-
             self.send_json({
                 'status': 'online',
                 'timestamp': datetime.now().isoformat(),
-                'commits': int(commits),
-                'tools': tools,
-                'services': {
-                    'dashboard': 'up' if dashboard else 'down',
-                }
+                **_status_cache["value"]
             })
         except Exception as e:
             self.send_json({'error': str(e)}, 500)
@@ -118,11 +177,7 @@ class WebhookHandler(BaseHTTPRequestHandler):
     def handle_commits(self):
         """Return recent commits"""
         try:
-            result = subprocess.run(
-                ["git", "-C", WORKSPACE, "log", "--oneline", "-10"],
-                capture_output=True, text=True
-            )
-            commits = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
+            commits = git_helper.recent_commits(10)
             
             self.send_json({
                 'commits': commits,
@@ -178,10 +233,7 @@ class WebhookHandler(BaseHTTPRequestHandler):
                     'data': data
                 }
                 
-                log_file = f"{WORKSPACE}/memory/external_updates.jsonl"
-                os.makedirs(os.path.dirname(log_file), exist_ok=True)
-                with open(log_file, 'a') as f:
-                    f.write(json.dumps(log_entry) + '\n')
+                _updates_log.log(log_entry)
                 
                 self.send_json({'received': True, 'logged': True})
             except json.JSONDecodeError:
@@ -193,7 +245,8 @@ def main():
     import sys
     port = int(sys.argv[1]) if len(sys.argv) > 1 else 8082
     
-    server = HTTPServer(("0.0.0.0", port), WebhookHandler)
+    # A thread per request, so a slow trigger doesn't hold up /health or /status
+    server = ThreadingHTTPServer(("0.0.0.0", port), WebhookHandler)
     print(f"🦅 Claw Webhook Server running on http://0.0.0.0:{port}")
     print(f"   Public:  GET /health")
     print(f"   Auth:    Bearer {AUTH_TOKEN[:10]}...")
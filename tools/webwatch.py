@@ -1,122 +1,415 @@
 #!/usr/bin/env python3
-os.environ["TZ"] = "America/St_Johns"
-import time
-time.tzset()
 """
 Claw's Web Watch - Autonomous website monitoring
 Watches websites for changes and logs them
 """
 
+import codecs
+import functools
 import hashlib
+import http.client
 import json
 import os
-import subprocess
+import random
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from urllib.parse import urlparse
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+from jsonl_log import BatchedJsonlLogger
+
+if "TZ" not in os.environ:
+    os.environ["TZ"] = "America/St_Johns"
+    time.tzset()
 
 WATCH_DIR = "/config/clawd/data/webwatch"
 LOG_FILE = "/config/clawd/memory/webwatch_log.jsonl"
+STATE_DB = os.path.join(WATCH_DIR, "state.db")
+FETCH_TIMEOUT = 30
+FETCH_CHUNK = 64 * 1024
+MAX_BACKOFF = 30
+MAX_REDIRECTS = 10
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+ASCII_SEPARATORS = bytes.maketrans(b'\x1c\x1d\x1e\x1f', b'    ')
+# Elements whose contents are code, not page text (nonces, tokens, build ids)
+SKIP_TAGS = frozenset({"script", "style"})
+# Which digest a stored hash came from; a different one means re-baseline, not "changed"
+DIGEST_HTML = "html-skeleton-v2"
+DIGEST_TEXT = "text-sha256"
+STATE_FIELDS = ("hash", "digest", "timestamp", "etag", "last_modified")
+MAX_WORKERS = 8
+
+_event_log = BatchedJsonlLogger(LOG_FILE)
+
+# Kept-alive connections, one set per thread, keyed by (scheme, host:port)
+_local = threading.local()
+
+# Site state lives in one SQLite table; check_sites calls check_site from
+# several threads, which share the connection under _db_lock
+_db = None
+_db_lock = threading.Lock()
+# list_watched_sites result; dropped on our own writes, and PRAGMA
+# data_version moves when another process writes the store
+_sites_cache = {"version": None, "sites": None}
 
 def ensure_dirs():
     os.makedirs(WATCH_DIR, exist_ok=True)
     os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
 
-def get_site_hash(url, retries=3):
-    """Fetch site and return content hash with retry logic"""
-    import time
+def state_db():
+    """The site-state store, opened once; the caller holds _db_lock.
+
+    Per-site <name>.json files from before the store existed are imported
+    the first time it is created, then removed so no stale copy is left
+    behind. The db and its WAL files are gitignored.
+    """
+    global _db
+    if _db is None:
+        ensure_dirs()
+        db = sqlite3.connect(STATE_DB, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        imported = []
+        with db:
+            db.execute("CREATE TABLE IF NOT EXISTS sites (name TEXT PRIMARY KEY, state TEXT NOT NULL)")
+            if db.execute("SELECT 1 FROM sites LIMIT 1").fetchone() is None:
+                with os.scandir(WATCH_DIR) as it:
+                    for entry in it:
+                        if entry.name.endswith('.json') and entry.is_file():
+                            with open(entry.path, 'r') as fp:
+                                db.execute("INSERT OR REPLACE INTO sites VALUES (?, ?)", (entry.name[:-5], fp.read()))
+                            imported.append(entry.path)
+        # Only once the import has committed
+        for path in imported:
+            os.remove(path)
+        _db = db
+    return _db
+
+def log_event(action, status, details=""):
+    """Log a fetch event"""
+    entry = {
+        "timestamp": datetime.now().isoformat(),
+        "action": action,
+        "status": status,
+        "details": details
+    }
+    _event_log.log(entry)
+
+def _get(scheme, netloc, path, headers):
+    """GET path over this thread's kept-alive connection to netloc"""
+    conns = _local.__dict__.setdefault("conns", {})
+    key = (scheme, netloc)
+    for attempt in range(2):
+        conn = conns.get(key)
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = conns[key] = cls(netloc, timeout=FETCH_TIMEOUT)
+        reused = conn.sock is not None
+        try:
+            conn.request("GET", path, headers=headers)
+            return conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            del conns[key]
+            # Only a kept-alive connection the server dropped is worth a retry
+            if attempt or not reused:
+                raise
+
+def open_url(url, headers=None):
+    """Open url like curl -s -L did: follow redirects, keep error pages"""
+    headers = {"User-Agent": "curl/8.0", **(headers or {})}
+    if urllib.request.getproxies():
+        # Leave proxying to urllib rather than reimplementing it
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            return urllib.request.urlopen(request, timeout=FETCH_TIMEOUT)
+        except urllib.error.HTTPError as e:
+            return e  # curl without -f still returned the body of 4xx/5xx pages
+    
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL: {url}")
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        response = _get(parts.scheme, parts.netloc, path, headers)
+        location = response.getheader("Location")
+        if response.status not in REDIRECT_CODES or not location:
+            # 4xx/5xx bodies are returned too, as curl without -f did
+            return response
+        response.read()  # drain so the connection can be reused
+        url = urljoin(url, location)
+    raise http.client.HTTPException(f"too many redirects for {url}")
+
+def hash_normalized(stream):
+    """Hash of ' '.join(body.split()) computed chunk by chunk, or None if the body is empty"""
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    # One reused receive buffer; the decoder reads straight out of it
+    buf = bytearray(FETCH_CHUNK)
+    view = memoryview(buf)
+    tail = b''
+    wrote = False
+    received = False
+    while True:
+        n = stream.readinto(buf)
+        final = not n
+        received = received or not final
+        chunk = buf if n == len(buf) else buf[:n]
+        if not final and chunk.isascii() and not decoder.getstate()[0]:
+            # Pure ASCII needs no decode/encode round trip; bytes.split only
+            # misses \x1c-\x1f, which str.split also treats as whitespace
+            data = tail + chunk.translate(ASCII_SEPARATORS)
+            words = data.split()
+            # A word that runs to the end of the chunk may continue in the next one
+            tail = words.pop() if words and not data[-1:].isspace() else b''
+            body = b' '.join(words)
+        else:
+            text = tail.decode() + decoder.decode(view[:n], final)
+            words = text.split()
+            tail = words.pop().encode() if words and not final and not text[-1].isspace() else b''
+            body = ' '.join(words).encode()
+        if words:
+            if wrote:
+                digest.update(b' ')
+            digest.update(body)
+            wrote = True
+        if final:
+            break
+    return digest.hexdigest()[:16] if received else None
+
+class SkeletonHasher(HTMLParser):
+    """Digest of an HTML page's tag skeleton plus its visible text.
+
+    Each start tag contributes tag@id.class and each run of text between
+    tags its whitespace-normalized form; attribute values such as CSRF
+    tokens and the bodies of SKIP_TAGS are ignored, so they no longer
+    register as changes.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.digest = hashlib.blake2b(digest_size=8)
+        self._text = []
+        self._skipping = None  # the SKIP_TAGS element whose body is being read
+
+    def _emit(self, token):
+        self.digest.update(token.encode() + b'\n')
+
+    def _flush_text(self):
+        text = ' '.join(' '.join(self._text).split())
+        self._text = []
+        if text:
+            self._emit("'" + text)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        attrs = dict(attrs)
+        self._emit(f"<{tag}@{attrs.get('id') or ''}.{attrs.get('class') or ''}")
+        if tag in SKIP_TAGS:
+            self._skipping = tag
+
+    def handle_endtag(self, tag):
+        if tag == self._skipping:
+            self._skipping = None
+        self._flush_text()
+
+    def handle_data(self, data):
+        if self._skipping is None:
+            self._text.append(data)
+
+    def hexdigest(self):
+        self._flush_text()
+        return self.digest.hexdigest()
+
+def hash_skeleton(stream):
+    """SkeletonHasher digest of an HTML stream, or None if the body is empty"""
+    parser = SkeletonHasher()
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    received = False
+    while True:
+        chunk = stream.read(FETCH_CHUNK)
+        received = received or bool(chunk)
+        parser.feed(decoder.decode(chunk, not chunk))
+        if not chunk:
+            break
+    parser.close()
+    return parser.hexdigest() if received else None
+
+def backoff_delay(attempt):
+    """Exponential backoff with jitter, so parallel checks of one host don't retry in step"""
+    return min(MAX_BACKOFF, (2 ** attempt) * (0.5 + random.random()))
+
+def get_site_hash(url, retries=3, prev=None):
+    """Fetch site and return (content hash, digest name, validators) with retry logic.
+
+    HTML pages are hashed by structure and visible text (DIGEST_HTML);
+    anything else by its whitespace-normalized body (DIGEST_TEXT).
+    With prev, the site's stored state, the request is conditional on its
+    ETag/Last-Modified and a 304 reuses prev's hash without a download.
+    validators holds the response's etag and last_modified for next time.
+    """
+    conditional = {}
+    if prev and prev.get("hash") and prev.get("digest"):
+        if prev.get("etag"):
+            conditional["If-None-Match"] = prev["etag"]
+        if prev.get("last_modified"):
+            conditional["If-Modified-Since"] = prev["last_modified"]
     
     for attempt in range(retries):
         try:
-            # Use curl to fetch with timeout
-            result = subprocess.run(
-                ["curl", "-s", "-L", "--max-time", "30", "--retry", "2", url],
-                capture_output=True,
-                text=True,
-                timeout=35
-            )
-            
-            if result.returncode == 0 and result.stdout:
-                # Hash the content (normalized - remove dynamic stuff)
-                content = result.stdout
-                # Simple normalization
-                content = ' '.join(content.split())  # Normalize whitespace
-                return hashlib.sha256(content.encode()).hexdigest()[:16]
+            # Stream the page through the hash instead of buffering it
+            with open_url(url, conditional) as response:
+                validators = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+                if response.status == 304:
+                    validators = {k: v or prev.get(k) for k, v in validators.items()}
+                    return prev["hash"], prev["digest"], validators
+                if response.headers.get_content_type() == "text/html":
+                    digest, site_hash = DIGEST_HTML, hash_skeleton(response)
+                else:
+                    digest, site_hash = DIGEST_TEXT, hash_normalized(response)
+            if site_hash:
+                return site_hash, digest, validators
             
             # Log failed attempt
             log_event("fetch_attempt", "retry", f"Attempt {attempt + 1}/{retries} failed for {url}")
             
             if attempt < retries - 1:
-                time.sleep(2 ** attempt)  # Exponential backoff
+                time.sleep(backoff_delay(attempt))
                 
-        except subprocess.TimeoutExpired:
+        except TimeoutError:
             log_event("fetch_attempt", "timeout", f"Attempt {attempt + 1}/{retries} timed out for {url}")
             if attempt < retries - 1:
-                time.sleep(2 ** attempt)
+                time.sleep(backoff_delay(attempt))
         except Exception as e:
             log_event("fetch_attempt", "error", f"Attempt {attempt + 1}/{retries} error: {str(e)}")
             if attempt < retries - 1:
-                time.sleep(2 ** attempt)
+                time.sleep(backoff_delay(attempt))
     
-    return None
+    return None, None, {}
+
+@functools.lru_cache(maxsize=1024)
+def _name_for(url):
+    """Default site name: the url's host with dots made underscores"""
+    return urlsplit(url).netloc.replace(".", "_")
+
+def load_state(name):
+    """Stored STATE_FIELDS for name, {} if never checked; the caller holds _db_lock"""
+    # SQLite pulls the fields out of the stored JSON; no Python-side parse
+    row = state_db().execute(
+        "SELECT " + ", ".join(f"json_extract(state, '$.{f}')" for f in STATE_FIELDS)
+        + " FROM sites WHERE name = ?", (name,)
+    ).fetchone()
+    return dict(zip(STATE_FIELDS, row)) if row else {}
+
+def check_site(url, name=None, seen=None):
+    """Check a single site for changes.
 
-def check_site(url, name=None):
-    """Check a single site for changes"""
+    seen, shared across one batch of checks, maps content hash -> the site
+    that first logged a change to it; mirrors that change to the same
+    content are marked duplicate_of instead of logged again.
+    """
     ensure_dirs()
     
-    name = name or urlparse(url).netloc.replace(".", "_")
-    state_file = os.path.join(WATCH_DIR, f"{name}.json")
+    name = name or _name_for(url)
     
-    current_hash = get_site_hash(url)
+    with _db_lock:
+        prev_state = load_state(name)
+    
+    current_hash, digest, validators = get_site_hash(url, prev=prev_state)
     if not current_hash:
         return {"error": "Failed to fetch", "url": url}
     
-    # Load previous state
-    prev_state = {}
-    if os.path.exists(state_file):
-        with open(state_file, 'r') as f:
-            prev_state = json.load(f)
-    
-    result = {
-        "timestamp": datetime.now().isoformat(),
-        "url": url,
-        "name": name,
-        "hash": current_hash,
-        "changed": False
-    }
-    
-    # Check for changes
-    if prev_state.get("hash"):
-        if prev_state["hash"] != current_hash:
-            result["changed"] = True
-            result["previous_check"] = prev_state.get("timestamp")
-    
-    # Save current state
-    with open(state_file, 'w') as f:
-        json.dump(result, f)
+    with _db_lock:
+        # Load previous state again: another check may have saved meanwhile
+        prev_state = load_state(name)
+        
+        result = {
+            "timestamp": datetime.now().isoformat(),
+            "url": url,
+            "name": name,
+            "hash": current_hash,
+            "digest": digest,
+            **{k: v for k, v in validators.items() if v},
+            "changed": False
+        }
+        
+        # Check for changes; states written before "digest" existed hold text hashes
+        if prev_state.get("hash") and (prev_state.get("digest") or DIGEST_TEXT) == digest:
+            if prev_state["hash"] != current_hash:
+                result["changed"] = True
+                result["previous_check"] = prev_state.get("timestamp")
+        
+        # Save current state
+        db = state_db()
+        with db:
+            db.execute("INSERT OR REPLACE INTO sites VALUES (?, ?)", (name, json.dumps(result)))
+        _sites_cache["sites"] = None
     
     # Log if changed
     if result["changed"]:
-        with open(LOG_FILE, 'a') as f:
-            f.write(json.dumps(result) + '\n')
+        first = seen.setdefault(current_hash, name) if seen is not None else name
+        if first != name:
+            result["duplicate_of"] = first
+        else:
+            _event_log.log(result)
     
     return result
 
+def check_sites(sites):
+    """Check many (url, name) pairs concurrently; results in input order"""
+    sites = list(sites)
+    if not sites:
+        return []
+    seen = {}
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(sites))) as pool:
+        results = list(pool.map(lambda site: check_site(*site, seen=seen), sites))
+    # The whole pass's change records go out in one write and one sync
+    _event_log.flush(sync=True)
+    return results
+
 def list_watched_sites():
     """List all sites being watched"""
-    ensure_dirs()
+    with _db_lock:
+        db = state_db()
+        version = db.execute("PRAGMA data_version").fetchone()[0]
+        if _sites_cache["sites"] is None or _sites_cache["version"] != version:
+            rows = db.execute(
+                "SELECT json_extract(state, '$.name'), json_extract(state, '$.url'),"
+                " json_extract(state, '$.timestamp'), json_extract(state, '$.hash')"
+                " FROM sites ORDER BY name"
+            ).fetchall()
+            _sites_cache["sites"] = [dict(zip(("name", "url", "last_check", "hash"), row)) for row in rows]
+            _sites_cache["version"] = version
+        return [dict(site) for site in _sites_cache["sites"]]
+
+def read_site_list(lines):
+    """(url, name or None) for each 'url [name]' line; blanks and # comments skipped"""
     sites = []
-    for f in os.listdir(WATCH_DIR):
-        if f.endswith('.json'):
-            with open(os.path.join(WATCH_DIR, f), 'r') as fp:
-                data = json.load(fp)
-                sites.append({
-                    "name": data.get("name"),
-                    "url": data.get("url"),
-                    "last_check": data.get("timestamp"),
-                    "hash": data.get("hash")
-                })
+    for line in lines:
+        fields = line.split()
+        if fields and not fields[0].startswith('#'):
+            sites.append((fields[0], fields[1] if len(fields) > 1 else None))
     return sites
 
+def print_results(results):
+    """One line per check_sites result"""
+    for result in results:
+        if "error" in result:
+            print(f"❌ {result['url']}: {result['error']}")
+        elif result.get("duplicate_of"):
+            print(f"🚨 {result['name']}: CHANGE DETECTED (same content as {result['duplicate_of']})")
+        elif result.get("changed"):
+            print(f"🚨 {result['name']}: CHANGE DETECTED (previous: {result.get('previous_check', 'unknown')})")
+        else:
+            print(f"✓ {result['name']}: no changes")
+
 def main():
     import sys
     
@@ -126,6 +419,9 @@ def main():
         print("")
         print("Usage:")
         print(f"  {sys.argv[0]} check <url> [name]  - Check a site")
+        print(f"  {sys.argv[0]} check <url> <url>...  - Check several sites at once")
+        print(f"  {sys.argv[0]} check-batch <file>  - Check the 'url [name]' lines of a file (- for stdin)")
+        print(f"  {sys.argv[0]} check-all         - Re-check every watched site")
         print(f"  {sys.argv[0]} list              - List watched sites")
         print("")
         print("Examples:")
@@ -146,7 +442,12 @@ def main():
     
     cmd = sys.argv[1]
     
-    if cmd == "check" and len(sys.argv) >= 3:
+    if cmd == "check" and len(sys.argv) >= 4 and all("://" in a for a in sys.argv[2:]):
+        urls = sys.argv[2:]
+        print(f"🔍 Checking {len(urls)} site(s)...")
+        print_results(check_sites((url, None) for url in urls))
+    
+    elif cmd == "check" and len(sys.argv) >= 3:
         url = sys.argv[2]
         name = sys.argv[3] if len(sys.argv) > 3 else None
         
@@ -165,6 +466,20 @@ def main():
             if result.get("previous_check"):
                 print(f"  Last change: {result['previous_check']}")
     
+    elif cmd == "check-batch" and len(sys.argv) >= 3:
+        if sys.argv[2] == "-":
+            sites = read_site_list(sys.stdin)
+        else:
+            with open(sys.argv[2], 'r') as f:
+                sites = read_site_list(f)
+        print(f"🔍 Checking {len(sites)} site(s)...")
+        print_results(check_sites(sites))
+    
+    elif cmd == "check-all":
+        sites = [(s["url"], s["name"]) for s in list_watched_sites() if s["url"]]
+        print(f"🔍 Checking {len(sites)} site(s)...")
+        print_results(check_sites(sites))
+    
     elif cmd == "list":
         sites = list_watched_sites()
         if sites:
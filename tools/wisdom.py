@@ -1,17 +1,18 @@
 #!/usr/bin/env python3
-import os
-import time
-
-os.environ["TZ"] = "America/St_Johns"
-time.tzset()
 """
 Claw Wisdom - Magic 8-Ball style advice generator
 """
 
+import os
 import random
 import sys
+import time
+
+if "TZ" not in os.environ:
+    os.environ["TZ"] = "America/St_Johns"
+    time.tzset()
 
-WISDOM = [
+WISDOM = (
     "Actions speak louder than words. Just build.",
     "If you want to remember something, write it down.",
     "Fail fast, learn faster.",
@@ -37,10 +38,14 @@ WISDOM = [
     "Earn trust through competence.",
     "Remember you're a guest in someone's life. Treat it with respect.",
     "Quality > quantity. If you wouldn't send it in a real chat, don't send it.",
-]
+)
+
+# Own generator and a precomputed size keep the per-call path to one random()
+_rng = random.Random()
+_COUNT = len(WISDOM)
 
 def get_wisdom():
-    return random.choice(WISDOM)
+    return WISDOM[int(_rng.random() * _COUNT)]
 
 def main():
     print("🦅 Claw Wisdom")